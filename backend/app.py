@@ -1,13 +1,21 @@
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import socketio
 import uvicorn
 import logging
 
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    uvloop = None
+
 import config
 from utils.logger import setup_project_logging
 from core.websocket_handler import WebSocketHandler
+from utils import json_codec
 from routes.secondbrain_proxy import router as secondbrain_router
 
 setup_project_logging(level=logging.DEBUG if config.DEBUG else logging.INFO)
@@ -15,16 +23,17 @@ logger = logging.getLogger(__name__)
 
 websocket_handler = None
 
+@lru_cache(maxsize=1)
 def _get_gpu_info() -> dict:
-    """Detect GPU availability for diagnostics."""
+    """Detect GPU availability for diagnostics (probed once per process)."""
     info = {"device": "cpu", "cuda_available": False, "providers": []}
-    try:
-        import onnxruntime as ort
-        info["providers"] = ort.get_available_providers()
-        if "CUDAExecutionProvider" in info["providers"]:
+    providers = config.available_onnx_providers()
+    if providers:
+        info["providers"] = list(providers)
+        if "CUDAExecutionProvider" in providers:
             info["cuda_available"] = True
             info["device"] = "cuda"
-    except ImportError:
+    else:
         info["onnxruntime"] = "not installed"
     if not info["cuda_available"]:
         try:
@@ -40,6 +49,7 @@ def _get_gpu_info() -> dict:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     gpu_info = _get_gpu_info()
+    app.state.gpu_info = gpu_info
     logger.info(f"Starting Pose Spatial Studio v1.2.2")
     logger.info(f"Host: {config.HOST}:{config.PORT}")
     logger.info(f"GPU: {gpu_info['device']} | CUDA: {gpu_info['cuda_available']} | Providers: {gpu_info['providers']}")
@@ -55,19 +65,21 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=config.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+if config.CORS_IN_APP:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=config.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 app.include_router(secondbrain_router)
 
 sio = socketio.AsyncServer(
     async_mode='asgi',
     cors_allowed_origins=config.SOCKETIO_CORS_ORIGINS,
+    json=json_codec,
     logger=False,
     engineio_logger=False
 )
@@ -85,7 +97,7 @@ async def root():
 @app.get("/health")
 async def health_check():
     stats = websocket_handler.get_stats()
-    stats["gpu"] = _get_gpu_info()
+    stats["gpu"] = app.state.gpu_info
     return stats
 
 @app.get("/info")
@@ -107,5 +119,8 @@ if __name__ == "__main__":
         "app:socket_app", 
         host=config.HOST, 
         port=config.PORT, 
+        loop="uvloop" if uvloop else "asyncio",
+        http="httptools",
+        ws="websockets",
         reload=config.DEBUG
     )
@@ -9,13 +9,20 @@ if "MKL_NUM_THREADS" not in os.environ:
 if "OPENBLAS_NUM_THREADS" not in os.environ:
     os.environ["OPENBLAS_NUM_THREADS"] = "1"
 
+from functools import lru_cache
 from pathlib import Path
-import json
+from typing import Optional
 import logging
+import cv2
+import orjson
 from utils.locate_path import get_project_root
 
 logger = logging.getLogger(__name__)
 
+# OpenCV keeps its own thread pool regardless of OMP_NUM_THREADS; streams
+# already run in parallel on the worker pool.
+cv2.setNumThreads(1)
+
 HOST = os.getenv("POSE_STUDIO_HOST", "0.0.0.0")
 PORT = int(os.getenv("POSE_STUDIO_PORT", 49101))
 DEBUG = False
@@ -26,6 +33,18 @@ POSE_WORKERS = int(os.getenv("POSE_WORKERS", str(min(os.cpu_count() or 4, 16))))
 # Maximum number of concurrent streams allowed server-wide
 MAX_CONCURRENT_STREAMS = int(os.getenv("MAX_CONCURRENT_STREAMS", "3"))
 
+# torch.compile the TCPFormer lifter on CUDA (first forward per batch size
+# pays a compile of tens of seconds)
+TCPFORMER_COMPILE = os.getenv("TCPFORMER_COMPILE", "0") == "1"
+
+# INT8 dynamic quantization of the TCPFormer Linears on CPU (opt-in: the
+# MPJPE cost of quantizing the lifter has not been measured)
+TCPFORMER_CPU_INT8 = os.getenv("TCPFORMER_CPU_INT8", "0") == "1"
+
+# Serve the INT8 (cpu) / FP16 (cuda) RTMPose variants built by
+# scripts/quantize_rtmpose.py (opt-in: their accuracy has not been measured)
+RTMPOSE_QUANTIZED = os.getenv("RTMPOSE_QUANTIZED", "0") == "1"
+
 CORS_ORIGINS = [
     "http://localhost:8585",
     "http://127.0.0.1:8585",
@@ -35,6 +54,10 @@ CORS_ORIGINS = [
 
 SOCKETIO_CORS_ORIGINS = "*"
 
+# Set to 0 when a reverse proxy (see deploy/nginx.conf) answers CORS, to skip
+# FastAPI's CORSMiddleware on every HTTP request
+CORS_IN_APP = os.getenv("POSE_STUDIO_CORS_IN_APP", "1") != "0"
+
 # SecondBrain agent-api — reachable via Docker internal network
 SECONDBRAIN_INTERNAL_URL = os.getenv(
     "SECONDBRAIN_INTERNAL_URL", "http://secondbrain-agent-api:8000"
@@ -47,18 +70,46 @@ OUTPUT_DIR = PROJECT_ROOT / "output"
 LOGS_DIR = PROJECT_ROOT / "logs"
 CACHE_DIR = PROJECT_ROOT / ".cache"
 
-DEFAULT_CONFIG = json.load(open(BASE_DIR / "config_template.json", "r"))
+DEFAULT_CONFIG = orjson.loads((BASE_DIR / "config_template.json").read_bytes())
+# Serialized snapshot used by merge_configs to deep-clone the defaults with a C-level parse
+_DEFAULT_CONFIG_JSON = orjson.dumps(DEFAULT_CONFIG)
 
-def detect_gpu_device() -> str:
-    """Detect available GPU device for inference acceleration."""
-    # Check ONNX Runtime CUDA provider (used by RTMPose)
+@lru_cache(maxsize=1)
+def available_onnx_providers() -> tuple:
+    """ONNX Runtime execution providers available in this process (enumerated once)."""
     try:
         import onnxruntime as ort
-        if 'CUDAExecutionProvider' in ort.get_available_providers():
-            logger.info("GPU detected: ONNX Runtime CUDAExecutionProvider")
-            return 'cuda'
+        return tuple(ort.get_available_providers())
     except ImportError:
-        pass
+        return ()
+
+def get_onnx_providers(device: str) -> list:
+    """Build the ONNX Runtime provider list, with provider options, for a device."""
+    providers = []
+    if device == 'cuda' and 'TensorrtExecutionProvider' in available_onnx_providers():
+        # Built engines are cached on disk so the compile cost is paid once
+        providers.append(("TensorrtExecutionProvider", {
+            "trt_fp16_enable": True,
+            "trt_engine_cache_enable": True,
+            "trt_engine_cache_path": str(CACHE_DIR / "trt"),
+        }))
+    if device == 'cuda' and 'CUDAExecutionProvider' in available_onnx_providers():
+        # Exhaustive cuDNN conv algo search costs far more than it saves on
+        # small pose models; grow the arena only by what is requested.
+        providers.append(("CUDAExecutionProvider", {
+            "cudnn_conv_algo_search": "DEFAULT",
+            "arena_extend_strategy": "kSameAsRequested",
+        }))
+    providers.append("CPUExecutionProvider")
+    return providers
+
+@lru_cache(maxsize=1)
+def detect_gpu_device() -> str:
+    """Detect available GPU device for inference acceleration (probed once per process)."""
+    # Check ONNX Runtime CUDA provider (used by RTMPose)
+    if 'CUDAExecutionProvider' in available_onnx_providers():
+        logger.info("GPU detected: ONNX Runtime CUDAExecutionProvider")
+        return 'cuda'
     # Check PyTorch CUDA (also indicates a usable NVIDIA GPU)
     try:
         import torch
@@ -71,15 +122,16 @@ def detect_gpu_device() -> str:
     return 'cpu'
 
 def _resolve_auto_device(config: dict) -> dict:
-    """Resolve 'auto' device setting to actual device."""
+    """Resolve 'auto' device setting to actual device and its ONNX Runtime providers."""
     if "pose_processor" in config:
         if config["pose_processor"].get("device") == "auto":
             config["pose_processor"]["device"] = detect_gpu_device()
+        config["pose_processor"]["onnx_providers"] = get_onnx_providers(
+            config["pose_processor"].get("device", "cpu"))
     return config
 
 def merge_configs(user_config: dict) -> dict:
-    import copy
-    merged = copy.deepcopy(DEFAULT_CONFIG)
+    merged = orjson.loads(_DEFAULT_CONFIG_JSON)
 
     if not user_config:
         return _resolve_auto_device(_convert_model_paths(merged))
@@ -91,6 +143,24 @@ def merge_configs(user_config: dict) -> dict:
 
     return _resolve_auto_device(_convert_model_paths(merged))
 
+def quantized_model_variant(model_path: str, device: str) -> str:
+    """Return the FP16 (cuda) or INT8 (cpu) variant of an ONNX model if one was built.
+
+    Variants are produced by scripts/quantize_rtmpose.py into MODELS_DIR/rtmpose
+    and are only used with RTMPOSE_QUANTIZED=1.
+    """
+    if not RTMPOSE_QUANTIZED:
+        return model_path
+    precision = "fp16" if device == "cuda" else "int8"
+    variant = MODELS_DIR / "rtmpose" / f"{Path(model_path).stem}_{precision}.onnx"
+    return str(variant) if variant.exists() else model_path
+
+def quantized_task_variant(model_path: str) -> Optional[str]:
+    """Return the INT8 sibling (``<stem>_int8<suffix>``) of a MediaPipe .task/.tflite model, if present."""
+    path = Path(model_path)
+    variant = path.with_name(f"{path.stem}_int8{path.suffix}")
+    return str(variant) if variant.exists() else None
+
 def _convert_model_paths(config: dict) -> dict:
     if "pose_processor" in config:
         for key in ["pose_landmarker_model_name", "object_detector_model_name", "gesture_recognizer_model_name"]:
@@ -1,12 +1,14 @@
 import asyncio
 import logging
-import json
 import time
 from concurrent.futures import ThreadPoolExecutor
 
 import cv2
 import numpy as np
-import base64
+try:
+    import pybase64 as base64  # SIMD base64 for legacy text frames
+except ImportError:
+    import base64
 from typing import Dict, Any, Tuple
 from processors.mediapipe_processor import MediaPipeProcessor
 from processors.rtmpose_processor import RTMPoseProcessor
@@ -19,19 +21,38 @@ from processors.base_processor import BaseProcessor
 from processors.data_processor import DataProcessor
 from config import DEFAULT_CONFIG, POSE_WORKERS, MAX_CONCURRENT_STREAMS
 from utils.log_streamer import SocketIOLogHandler
+from utils import json_codec
 from utils.kinetic import Converter
 
 logger = logging.getLogger(__name__)
 
+# Outgoing frame encoding. Quality 85 is roughly half the bytes of 100 with no
+# visible difference; baseline (non-progressive, non-optimized) keeps
+# libjpeg-turbo on its fast path.
+_JPEG_EXT = '.jpg'
+_JPEG_PARAMS = [
+    cv2.IMWRITE_JPEG_QUALITY, 85,
+    cv2.IMWRITE_JPEG_PROGRESSIVE, 0,
+    cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+]
+
+# Channel count per pixel format accepted by process_frame_raw
+_RAW_PIXFMT_CHANNELS = {'bgr': 3, 'rgb': 3, 'rgba': 4}
+
 class WebSocketHandler:
     def __init__(self, sio):
         self.sio = sio
-        self.processors: Dict[str, Dict[str, BaseProcessor]] = {}
+        # sid -> stream_id -> pipeline, so a client's streams are found without scanning
+        self.processors: Dict[str, Dict[str, Dict[str, BaseProcessor]]] = {}
         self._executor = ThreadPoolExecutor(max_workers=POSE_WORKERS, thread_name_prefix="pose-worker")
+        # Per-stream state below is keyed by (sid, stream_id)
         # Per-stream latest frame buffer: only the newest frame is kept
-        self._latest_frames: Dict[str, Tuple] = {}  # processor_id -> (frame, timestamp, sid, stream_id)
-        self._active_streams: set = set()  # processor_ids currently being processed
-        self._stream_metrics: Dict[str, Dict[str, Any]] = {}
+        self._latest_frames: Dict[Tuple[str, str], Tuple] = {}  # -> (frame, timestamp, sid, stream_id)
+        self._active_streams: set = set()  # streams currently being processed
+        self._consumer_tasks: Dict[Tuple[str, str], asyncio.Task] = {}  # per-stream consumer task
+        self._chains: Dict[Tuple[str, str], Tuple] = {}  # -> (pre-processing calls, pose call)
+        self._stream_metrics: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._frames_dropped: Dict[Tuple[str, str], int] = {}  # pending frames superseded before processing
         self._last_stats_log: float = 0
         self._log_handlers: Dict[str, SocketIOLogHandler] = {}  # sid -> handler
         logger.info(f"Thread pool initialized with {POSE_WORKERS} workers")
@@ -41,7 +62,7 @@ class WebSocketHandler:
         @self.sio.event
         async def connect(sid, environ):
             logger.info(f"[CONN] Client connected: {sid}")
-            logger.debug(f"[CONN] Total active processors: {len(self.processors)}")
+            logger.debug(f"[CONN] Total active processors: {self._stream_count()}")
             await self.sio.emit('connection_status', {'status': 'connected', 'sid': sid}, room=sid)
         
         @self.sio.event
@@ -49,10 +70,10 @@ class WebSocketHandler:
             logger.info(f"[DISC] Client disconnected: {sid}")
             logger.debug(f"[DISC] Cleaning up processors for client {sid}")
 
-            processors_to_cleanup = [pid for pid in self.processors.keys() if pid.startswith(f"{sid}_")]
-            logger.debug(f"[DISC] Found {len(processors_to_cleanup)} processors to cleanup: {processors_to_cleanup}")
-            for processor_id in processors_to_cleanup:
-                self.cleanup_processor(processor_id)
+            streams_to_cleanup = list(self.processors.get(sid, ()))
+            logger.debug(f"[DISC] Found {len(streams_to_cleanup)} processors to cleanup: {streams_to_cleanup}")
+            for stream_id in streams_to_cleanup:
+                self.cleanup_processor(sid, stream_id)
 
             # Clean up log handler if subscribed
             handler = self._log_handlers.pop(sid, None)
@@ -80,7 +101,7 @@ class WebSocketHandler:
                 logger.info(f"[INIT] Initializing stream {stream_id} for client {sid}")
                 logger.debug(f"[INIT] Processor type: {processor_type}, config: {processor_config}")
                 
-                if processor_id in self.processors:
+                if stream_id in self.processors.get(sid, ()):
                     logger.warning(f"[INIT] Processor {processor_id} already exists")
                     await self.sio.emit('stream_initialized', {
                         'stream_id': stream_id,
@@ -90,7 +111,7 @@ class WebSocketHandler:
                     return
 
                 # Enforce global concurrent stream limit
-                active_count = len(self.processors)
+                active_count = self._stream_count()
                 if active_count >= MAX_CONCURRENT_STREAMS:
                     logger.warning(
                         f"[INIT] Stream limit reached ({active_count}/{MAX_CONCURRENT_STREAMS}). "
@@ -119,7 +140,7 @@ class WebSocketHandler:
                     logger.info(f"[INIT] Image processor created: {processor_id}")
 
                 if processor_config.get('data_processor', {}):
-                    processor_pipeline['date_processor'] = DataProcessor(processor_id, processor_config)
+                    processor_pipeline['data_processor'] = DataProcessor(processor_id, processor_config)
                     logger.info(f"[INIT] Data processor created: {processor_id}")
 
                 if processor_config.get('pose_processor', {}):
@@ -148,18 +169,18 @@ class WebSocketHandler:
                         }, room=sid)
                         return
                 
-                if not all([processor.initialize() for processor in processor_pipeline.values()]):
-                    logger.error(f"[INIT] Processor initialization failed")
+                if not self._initialize_pipeline(processor_pipeline):
                     await self.sio.emit('stream_error', {
                         'stream_id': stream_id,
                         'message': 'Failed to initialize processor. Check config parameters.'
                     }, room=sid)
                     return
                 
-                self.processors[processor_id] = processor_pipeline
+                self.processors.setdefault(sid, {})[stream_id] = processor_pipeline
+                self._chains[(sid, stream_id)] = self._build_chain(processor_pipeline)
                 logger.info(f"[INIT] ✓ Stream {stream_id} initialized successfully with {processor_type} (processor_id: {processor_id})")
-                logger.debug(f"[INIT] Active processors: {list(self.processors.keys())}")
-                logger.debug(f"[INIT] Processor pipeline: {self.processors.values()}")
+                logger.debug(f"[INIT] Active processors: {list(self._chains)}")
+                logger.debug(f"[INIT] Processor pipeline: {processor_pipeline}")
                 
                 await self.sio.emit('stream_initialized', {
                     'stream_id': stream_id,
@@ -178,42 +199,33 @@ class WebSocketHandler:
         @self.sio.event
         async def process_frame(sid, data):
             try:
-                stream_id = data.get('stream_id')
-                processor_id = f"{sid}_{stream_id}"
-                timestamp = data.get('timestamp_ms', 0)
-                logger.debug(f"[FRAME] Received frame for {stream_id} t={timestamp}")
-
-                if processor_id not in self.processors:
-                    logger.warning(f"[ERROR] Processor {processor_id} not found")
-                    await self.sio.emit('error', {
-                        'message': 'Stream not initialized. Call initialize_stream first.'
-                    }, room=sid)
-                    return
-
-                frame = self._decode_frame(data.get('frame'))
-                if frame is None:
-                    logger.warning(f"[FRAME] Decode failed for {stream_id}")
-                    await self.sio.emit('error', {'message': 'Invalid frame data'}, room=sid)
-                    return
-
-                # Store only the latest frame per stream, dropping any older pending frame
-                self._latest_frames[processor_id] = (frame, timestamp, sid, stream_id)
-
-                # If this stream is already being processed, the newer frame will be
-                # picked up when the current processing finishes — no queue buildup
-                if processor_id not in self._active_streams:
-                    self._active_streams.add(processor_id)
-                    asyncio.ensure_future(self._process_latest_frame(processor_id))
-
+                await self._enqueue_frame(sid, data.get('stream_id'), data.get('frame'),
+                                          data.get('timestamp_ms', 0))
             except Exception as e:
                 logger.error(f"Error processing frame: {e}", exc_info=True)
                 await self.sio.emit('error', {'message': str(e)}, room=sid)
-        
+
+        @self.sio.event
+        async def process_frame_raw(sid, data):
+            """Receive an uncompressed frame: {stream_id, width, height, pixfmt, data, timestamp_ms}."""
+            try:
+                raw = None
+                if data.get('data'):
+                    raw = {
+                        'width': data.get('width'),
+                        'height': data.get('height'),
+                        'pixfmt': data.get('pixfmt', 'bgr'),
+                        'data': data.get('data'),
+                    }
+                await self._enqueue_frame(sid, data.get('stream_id'), raw,
+                                          data.get('timestamp_ms', 0))
+            except Exception as e:
+                logger.error(f"Error processing raw frame: {e}", exc_info=True)
+                await self.sio.emit('error', {'message': str(e)}, room=sid)
+
         @self.sio.event
         async def cleanup_processor(sid, data):
-            stream_id = data.get('stream_id')
-            processor_id = f"{sid}_{stream_id}"
-            self.cleanup_processor(processor_id)
+            self.cleanup_processor(sid, data.get('stream_id'))
         
         @self.sio.event
         async def switch_model(sid, data):
@@ -230,14 +242,14 @@ class WebSocketHandler:
                     }, room=sid)
                     return
 
-                if processor_id not in self.processors:
+                pipeline = self.processors.get(sid, {}).get(stream_id)
+                if pipeline is None:
                     await self.sio.emit('stream_error', {
                         'stream_id': stream_id,
                         'message': 'Stream not initialized'
                     }, room=sid)
                     return
 
-                pipeline = self.processors[processor_id]
                 current_pose = pipeline.get('pose_processor')
 
                 # Determine current processor type
@@ -309,14 +321,16 @@ class WebSocketHandler:
 
                 # Drain pending frames and wait for in-flight processing to finish
                 # before swapping, to avoid using a cleaned-up processor
-                self._latest_frames.pop(processor_id, None)
-                while processor_id in self._active_streams:
+                key = (sid, stream_id)
+                self._latest_frames.pop(key, None)
+                while key in self._active_streams:
                     await asyncio.sleep(0.01)
 
                 # Cleanup old pose processor and swap in the new one
                 if current_pose:
                     current_pose.cleanup()
                 pipeline['pose_processor'] = new_pose
+                self._chains[key] = self._build_chain(pipeline)
 
                 logger.info(f"[SWITCH] Stream {stream_id} switched to {new_processor_type}")
 
@@ -337,16 +351,15 @@ class WebSocketHandler:
         async def flush_stream(sid, data):
             try:
                 stream_id = data.get('stream_id')
-                processor_id = f"{sid}_{stream_id}"
-                
-                if processor_id in self.processors:
-                    pipeline = self.processors[processor_id]
+                pipeline = self.processors.get(sid, {}).get(stream_id)
+
+                if pipeline is not None:
                     pose_processor = pipeline.get('pose_processor')
-                    if pose_processor and hasattr(pose_processor, 'result_lock'):
-                        with pose_processor.result_lock:
-                            for attr in ['latest_pose_result', 'latest_object_result', 'latest_gesture_result']:
-                                if hasattr(pose_processor, attr):
-                                    setattr(pose_processor, attr, None)
+                    if pose_processor is not None:
+                        # Single reference stores are atomic under the GIL; no lock needed
+                        for attr in ('latest_pose_result', 'latest_object_result', 'latest_gesture_result'):
+                            if hasattr(pose_processor, attr):
+                                setattr(pose_processor, attr, None)
                     
                     logger.info(f"[FLUSH] Stream {stream_id} flushed")
                     await self.sio.emit('stream_flushed', {'stream_id': stream_id}, room=sid)
@@ -406,36 +419,90 @@ class WebSocketHandler:
                     "error": str(e),
                 }, room=sid)
 
-    async def _process_latest_frame(self, processor_id: str):
+    @staticmethod
+    def _initialize_pipeline(processor_pipeline: Dict[str, BaseProcessor]) -> bool:
+        """Initialize stages in order, stopping at the first failure.
+
+        Stages that were already initialized are cleaned up on failure so their
+        models are not leaked.
+        """
+        initialized = []
+        for name, processor in processor_pipeline.items():
+            if not processor.initialize():
+                logger.error(f"[INIT] {name} initialization failed")
+                for done in initialized:
+                    done.cleanup()
+                return False
+            initialized.append(processor)
+        return True
+
+    async def _enqueue_frame(self, sid, stream_id, frame_data, timestamp):
+        """Buffer an incoming (still encoded) frame and start the stream consumer if idle."""
+        logger.debug(f"[FRAME] Received frame for {stream_id} t={timestamp}")
+
+        key = (sid, stream_id)
+        if key not in self._chains:
+            logger.warning(f"[ERROR] Processor {sid}_{stream_id} not found")
+            await self.sio.emit('error', {
+                'message': 'Stream not initialized. Call initialize_stream first.'
+            }, room=sid)
+            return
+
+        if not frame_data:
+            await self.sio.emit('error', {'message': 'Invalid frame data'}, room=sid)
+            return
+
+        # Store only the latest frame per stream, dropping any older pending
+        # frame; decoding happens on the worker thread
+        if key in self._latest_frames:
+            self._frames_dropped[key] = self._frames_dropped.get(key, 0) + 1
+        self._latest_frames[key] = (frame_data, timestamp, sid, stream_id)
+
+        # If this stream is already being processed, the newer frame will be
+        # picked up when the current processing finishes — no queue buildup
+        if key not in self._active_streams:
+            self._active_streams.add(key)
+            self._consumer_tasks[key] = asyncio.create_task(
+                self._process_latest_frame(key))
+
+    async def _process_latest_frame(self, key: Tuple[str, str]):
         """Process the latest frame for a stream, then check for newer ones."""
         try:
-            while processor_id in self._latest_frames:
+            while key in self._latest_frames:
                 # Grab the latest frame and clear the buffer
-                frame, timestamp, sid, stream_id = self._latest_frames.pop(processor_id)
+                frame_data, timestamp, sid, stream_id = self._latest_frames.pop(key)
 
-                processor_pipeline = self.processors.get(processor_id)
-                if not processor_pipeline:
+                chain = self._chains.get(key)
+                if chain is None:
                     break
 
+                # Decode, inference and encode all run on the worker pool so the
+                # event loop stays free for other clients
                 loop = asyncio.get_event_loop()
-                processed_frame, pose_data = await loop.run_in_executor(
+                jpeg_bytes, pose_data = await loop.run_in_executor(
                     self._executor,
                     self._run_pipeline_sync,
-                    processor_pipeline, frame, timestamp, processor_id
+                    chain, frame_data, timestamp, key
                 )
 
-                _, buffer = cv2.imencode('.jpg', processed_frame, [cv2.IMWRITE_JPEG_QUALITY, 100])
+                if jpeg_bytes is None:
+                    logger.warning(f"[FRAME] Frame codec failed for {stream_id}")
+                    await self.sio.emit('error', {'message': 'Invalid frame data'}, room=sid)
+                    continue
 
                 emit_payload = {
                     'stream_id': stream_id,
-                    'frame': base64.b64encode(buffer).decode('utf-8'),
+                    'frame': jpeg_bytes,
                     'pose_data': pose_data,
-                    'timestamp_ms': timestamp
+                    'timestamp_ms': timestamp,
+                    'frames_dropped': self._frames_dropped.get(key, 0),
                 }
 
-                # Pre-flight JSON check: catch numpy types before socketio's internal serializer
+                # Pre-flight JSON check with the same codec socketio uses, so an
+                # unserializable type drops pose_data instead of the whole emit
+                # (the binary frame is sent as a Socket.IO attachment, so skip it here)
                 try:
-                    json.dumps(emit_payload)
+                    json_codec.dumps(pose_data)
                 except TypeError as json_err:
                     logger.error(f"[FRAME] JSON serialization would fail: {json_err}")
                     logger.debug(f"[FRAME] pose_data types: {self._dump_types(pose_data)}")
@@ -448,44 +515,66 @@ class WebSocketHandler:
                 if now - self._last_stats_log > 30:
                     self._last_stats_log = now
                     logger.info(
-                        f"[STATS] streams={len(self.processors)} "
+                        f"[STATS] streams={self._stream_count()} "
                         f"processing={len(self._active_streams)} "
                         f"pending={len(self._latest_frames)}"
                     )
+        except asyncio.CancelledError:
+            logger.debug(f"[FRAME] Consumer for {key} cancelled")
         except Exception as e:
             logger.error(f"Error in _process_latest_frame: {e}", exc_info=True)
         finally:
-            self._active_streams.discard(processor_id)
+            if self._consumer_tasks.get(key) is asyncio.current_task():
+                del self._consumer_tasks[key]
+                self._active_streams.discard(key)
 
-    def _run_pipeline_sync(self, processor_pipeline, frame, timestamp, processor_id=None):
-        """Run the processor pipeline synchronously. Called from thread pool."""
+    @staticmethod
+    def _build_chain(processor_pipeline: Dict[str, BaseProcessor]) -> Tuple:
+        """Resolve a pipeline into (pre-processing calls, pose call) once, outside the frame loop."""
+        pre = tuple(processor_pipeline[name].process_frame
+                    for name in ('image_processor', 'data_processor')
+                    if name in processor_pipeline)
+        pose = processor_pipeline.get('pose_processor')
+        return pre, pose.process_frame if pose else None
+
+    def _run_pipeline_sync(self, chain, frame_data, timestamp, key=None):
+        """Decode, run the processor chain and JPEG-encode the result. Called from thread pool.
+
+        Returns (jpeg_bytes, pose_data); jpeg_bytes is None if the frame could not be decoded
+        or encoded.
+        """
         t0 = time.perf_counter()
         pose_data = None
-        processed_frame = frame
-
-        if 'image_processor' in processor_pipeline:
-            processed_frame = processor_pipeline['image_processor'].process_frame(processed_frame, timestamp)
-            logger.debug("[FRAME] image_processor done")
-        if 'date_processor' in processor_pipeline:
-            data_result = processor_pipeline['date_processor'].process_frame(processed_frame, timestamp)
-            if data_result is not None:
-                processed_frame = data_result
-            logger.debug(f"[FRAME] data_processor done, result={'kept' if data_result is not None else 'None (using fallback)'}")
-        if 'pose_processor' in processor_pipeline:
-            result = processor_pipeline['pose_processor'].process_frame(processed_frame, timestamp)
+        processed_frame = self._decode_frame(frame_data)
+        if processed_frame is None:
+            return None, None
+
+        pre_chain, pose_fn = chain
+        for process in pre_chain:
+            # Stages return None when they have no output yet (e.g. data_processor throttling)
+            stage_result = process(processed_frame, timestamp)
+            if stage_result is not None:
+                processed_frame = stage_result
+        if pose_fn is not None:
+            result = pose_fn(processed_frame, timestamp)
             if result is not None:
                 processed_frame = result['processed_frame']
                 pose_data = result['data']
-            logger.debug(f"[FRAME] pose_processor done, pose_data={'present' if pose_data else 'None'}")
+        logger.debug(f"[FRAME] pipeline done, pose_data={'present' if pose_data else 'None'}")
+
+        ok, buffer = cv2.imencode(_JPEG_EXT, processed_frame, _JPEG_PARAMS)
+        if not ok:
+            logger.warning(f"[FRAME] JPEG encode failed for {key}")
+            return None, None
 
         elapsed_ms = (time.perf_counter() - t0) * 1000
-        if processor_id:
-            self._stream_metrics[processor_id] = {
+        if key:
+            self._stream_metrics[key] = {
                 "last_process_ms": round(elapsed_ms, 1),
                 "timestamp": timestamp,
             }
 
-        return processed_frame, pose_data
+        return buffer.tobytes(), pose_data
 
     @staticmethod
     def _dump_types(obj, depth=0):
@@ -500,27 +589,63 @@ class WebSocketHandler:
             return type(obj).__name__
         return f"{type(obj).__module__}.{type(obj).__name__}"
 
-    def _decode_frame(self, frame_data: str) -> np.ndarray:
+    def _decode_frame(self, frame_data) -> np.ndarray:
+        """Decode a JPEG frame sent as raw binary (bytes/memoryview).
+
+        Uncompressed frames from process_frame_raw arrive as a dict and skip
+        JPEG decoding entirely. Legacy clients still send a base64 string
+        (optionally a data URL); that path is kept for backwards compatibility.
+        """
         try:
-            if frame_data.startswith('data:image'):
-                frame_data = frame_data.split(',')[1]
-            img_bytes = base64.b64decode(frame_data)
-            return cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
+            if isinstance(frame_data, dict):
+                return self._decode_raw_frame(frame_data)
+            if isinstance(frame_data, str):
+                if frame_data.startswith('data:image'):
+                    frame_data = frame_data[frame_data.find(',') + 1:]
+                frame_data = base64.b64decode(frame_data, validate=False)
+            return cv2.imdecode(np.frombuffer(frame_data, np.uint8), cv2.IMREAD_COLOR)
         except Exception as e:
             logger.error(f"Error decoding frame: {e}")
             return None
     
-    def cleanup_processor(self, processor_id: str):
-        self._latest_frames.pop(processor_id, None)
-        self._active_streams.discard(processor_id)
-        self._stream_metrics.pop(processor_id, None)
-        if processor_id in self.processors:
+    @staticmethod
+    def _decode_raw_frame(raw: Dict[str, Any]) -> np.ndarray:
+        """Wrap uncompressed pixels in an ndarray; BGR input is used without a copy."""
+        pixfmt = raw['pixfmt']
+        channels = _RAW_PIXFMT_CHANNELS[pixfmt]
+        frame = np.frombuffer(raw['data'], np.uint8).reshape(
+            int(raw['height']), int(raw['width']), channels)
+        if pixfmt == 'rgb':
+            return cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        if pixfmt == 'rgba':
+            return cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR)
+        return frame
+
+    def _stream_count(self) -> int:
+        """Number of initialized streams across all clients (one chain per stream)."""
+        return len(self._chains)
+
+    def cleanup_processor(self, sid: str, stream_id: str):
+        key = (sid, stream_id)
+        processor_id = f"{sid}_{stream_id}"
+        self._latest_frames.pop(key, None)
+        self._chains.pop(key, None)
+        self._active_streams.discard(key)
+        task = self._consumer_tasks.pop(key, None)
+        if task:
+            task.cancel()
+        self._stream_metrics.pop(key, None)
+        self._frames_dropped.pop(key, None)
+        client_streams = self.processors.get(sid, {})
+        pipeline = client_streams.pop(stream_id, None)
+        if not client_streams:
+            self.processors.pop(sid, None)
+        if pipeline is not None:
             logger.debug(f"[CLEANUP] Cleaning up processor: {processor_id}")
-            for processor in self.processors[processor_id]:
-                self.processors[processor_id][processor].cleanup()
-            del self.processors[processor_id]
+            for processor in pipeline.values():
+                processor.cleanup()
             logger.info(f"[CLEANUP] ✓ Cleaned up processor: {processor_id}")
-            logger.debug(f"[CLEANUP] Remaining processors: {list(self.processors.keys())}")
+            logger.debug(f"[CLEANUP] Remaining processors: {list(self._chains)}")
         else:
             logger.debug(f"[CLEANUP] Processor {processor_id} not found (already cleaned up?)")
     
@@ -529,20 +654,22 @@ class WebSocketHandler:
             logging.getLogger().removeHandler(handler)
             handler.close()
         self._log_handlers.clear()
-        for processor_id in list(self.processors.keys()):
-            self.cleanup_processor(processor_id)
-        self._executor.shutdown(wait=False)
+        for sid, client_streams in list(self.processors.items()):
+            for stream_id in list(client_streams):
+                self.cleanup_processor(sid, stream_id)
+        self._executor.shutdown(wait=False, cancel_futures=True)
     
     def get_stats(self) -> Dict[str, Any]:
         return {
-            "active_processors": len(self.processors),
+            "active_processors": self._stream_count(),
             "max_concurrent_streams": MAX_CONCURRENT_STREAMS,
-            "processor_ids": list(self.processors.keys()),
+            "processor_ids": [f"{sid}_{stream_id}" for sid, stream_id in self._chains],
             "active_streams_processing": len(self._active_streams),
             "pending_frames": len(self._latest_frames),
             "thread_pool": {
                 "max_workers": self._executor._max_workers,
             },
-            "stream_metrics": dict(self._stream_metrics),
+            "stream_metrics": {f"{sid}_{stream_id}": {**metrics, "frames_dropped": self._frames_dropped.get((sid, stream_id), 0)}
+                               for (sid, stream_id), metrics in self._stream_metrics.items()},
         }
 
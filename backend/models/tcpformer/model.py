@@ -6,18 +6,68 @@ Only the modules required for forward-pass inference are kept:
   TransBlock, DSTFormerBlock, MemoryInducedBlock, MemoryInducedTransformer.
 
 Fixes applied vs. upstream:
-  - MemoryInducedBlock.layer_scale converted from plain list to nn.ParameterList
-    (original never registers these params; they stay at init value 1e-5 regardless).
+  - MemoryInducedBlock.layer_scale converted from plain list to a registered
+    parameter (original never registers these params; they stay at init value 1e-5
+    regardless).
   - Removed hardcoded ``os.environ['CUDA_VISIBLE_DEVICES']`` and ``.to('cuda')``.
 """
 
+import re
 from collections import OrderedDict
+from functools import lru_cache
 
 import torch
+import torch.nn.functional as F
 from torch import nn
 from timm.models.layers import DropPath
 
 
+def _sdpa(q, k, v, scale, attn_drop, training):
+    """softmax(q @ k^T * scale) @ v over the last two dims via the fused SDPA kernels.
+
+    Leading dims are folded into the 4-D (batch, heads, L, C) layout the flash /
+    memory-efficient backends expect, so the attention matrix is never materialized.
+    """
+    lead = q.shape[:-2]
+    out = F.scaled_dot_product_attention(
+        q.reshape(-1, lead[-1], *q.shape[-2:]),
+        k.reshape(-1, lead[-1], *k.shape[-2:]),
+        v.reshape(-1, lead[-1], *v.shape[-2:]),
+        dropout_p=attn_drop.p if training else 0., scale=scale)
+    return out.reshape(*lead, *out.shape[-2:])
+
+
+@lru_cache(maxsize=1)
+def _cuda_half_dtype():
+    """BF16 where the GPU supports it (Ampere+), FP16 otherwise."""
+    return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+
+
+def _register_layer_scale(module, n, dim, use_layer_scale, init_value):
+    """Register ``module.layer_scale`` as (n, dim): learned if enabled, else a fixed buffer of ones.
+
+    Always having the tensor keeps forward free of ``use_layer_scale`` branches.
+    """
+    if use_layer_scale:
+        module.layer_scale = nn.Parameter(init_value * torch.ones(n, dim))
+    else:
+        module.register_buffer('layer_scale', torch.ones(n, dim), persistent=False)
+
+
+def _residual(x, scale, y, drop_path):
+    """``x + drop_path(scale * y)``; one fused addcmul kernel when drop_path is inactive."""
+    if isinstance(drop_path, nn.Identity) or not drop_path.training:
+        return torch.addcmul(x, scale, y)
+    return x + drop_path(scale * y)
+
+
+def _pack_legacy_scales(state_dict, prefix, legacy_keys):
+    """Stack per-branch layer-scale vectors from older checkpoints into the packed ``layer_scale``."""
+    keys = [prefix + k for k in legacy_keys]
+    if all(k in state_dict for k in keys):
+        state_dict[prefix + 'layer_scale'] = torch.stack([state_dict.pop(k) for k in keys])
+
+
 # ---------------------------------------------------------------------------
 # MLP
 # ---------------------------------------------------------------------------
@@ -28,14 +78,16 @@ class MLP(nn.Module):
         out_features = out_features or in_features
         hidden_features = hidden_features or in_features
         self.fc1 = nn.Linear(in_features, hidden_features)
-        self.act = act_layer()
+        # Exact (erf) GELU as trained; called functionally to skip module dispatch
+        self.act = F.gelu if act_layer is nn.GELU else act_layer()
         self.fc2 = nn.Linear(hidden_features, out_features)
-        self.drop = nn.Dropout(drop)
+        self.drop_p = drop
 
     def forward(self, x):
-        x = self.drop(self.act(self.fc1(x)))
-        x = self.drop(self.fc2(x))
-        return x
+        if self.training and self.drop_p > 0:
+            x = F.dropout(self.act(self.fc1(x)), self.drop_p)
+            return F.dropout(self.fc2(x), self.drop_p)
+        return self.fc2(self.act(self.fc1(x)))
 
 
 # ---------------------------------------------------------------------------
@@ -57,10 +109,10 @@ class Attention(nn.Module):
 
     def forward(self, x):
         B, T, J, C = x.shape
-        qkv = (self.qkv(x)
-               .reshape(B, T, J, 3, self.num_heads, C // self.num_heads)
-               .permute(3, 0, 4, 1, 2, 5))  # (3, B, H, T, J, Cd)
-        q, k, v = qkv[0], qkv[1], qkv[2]
+        # Split heads with a view and unbind q/k/v as views: (B, T, J, H, Cd) each
+        q, k, v = (self.qkv(x)
+                   .view(B, T, J, 3, self.num_heads, C // self.num_heads)
+                   .unbind(3))
         if self.mode == 'spatial':
             x = self._spatial(q, k, v)
         elif self.mode == 'temporal':
@@ -70,15 +122,17 @@ class Attention(nn.Module):
         return self.proj_drop(self.proj(x))
 
     def _spatial(self, q, k, v):
-        B, H, T, J, C = q.shape
-        attn = self.attn_drop((q @ k.transpose(-2, -1) * self.scale).softmax(-1))
-        return (attn @ v).permute(0, 2, 3, 1, 4).reshape(B, T, J, C * H)
+        B, T, J, H, C = q.shape
+        # (B,T,H,J,C): B and T stay adjacent, so folding them into the batch is a view
+        qs, ks, vs = (t.transpose(2, 3) for t in (q, k, v))
+        out = _sdpa(qs, ks, vs, self.scale, self.attn_drop, self.training)
+        return out.transpose(2, 3).reshape(B, T, J, H * C)
 
     def _temporal(self, q, k, v):
-        B, H, T, J, C = q.shape
-        qt, kt, vt = (t.transpose(2, 3) for t in (q, k, v))  # (B,H,J,T,C)
-        attn = self.attn_drop((qt @ kt.transpose(-2, -1) * self.scale).softmax(-1))
-        return (attn @ vt).permute(0, 3, 2, 1, 4).reshape(B, T, J, C * H)
+        B, T, J, H, C = q.shape
+        qt, kt, vt = (t.permute(0, 2, 3, 1, 4) for t in (q, k, v))  # (B,J,H,T,C)
+        out = _sdpa(qt, kt, vt, self.scale, self.attn_drop, self.training)
+        return out.permute(0, 3, 1, 2, 4).reshape(B, T, J, H * C)
 
 
 # ---------------------------------------------------------------------------
@@ -93,27 +147,39 @@ class CrossAttention(nn.Module):
         head_dim = dim_in // num_heads
         self.scale = qkv_scale or head_dim ** -0.5
         self.wq = nn.Linear(dim_in, dim_in, bias=qkv_bias)
-        self.wk = nn.Linear(dim_in, dim_in, bias=qkv_bias)
-        self.wv = nn.Linear(dim_in, dim_in, bias=qkv_bias)
+        # k and v both project kv, so they share one GEMM
+        self.wkv = nn.Linear(dim_in, dim_in * 2, bias=qkv_bias)
         self.attn_drop = nn.Dropout(attn_drop)
         self.proj = nn.Linear(dim_in, dim_out)
         self.proj_drop = nn.Dropout(proj_drop)
         self.back_att = back_att
 
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        # Upstream checkpoints store separate wk / wv projections
+        for name in ('weight', 'bias'):
+            k_key, v_key = f'{prefix}wk.{name}', f'{prefix}wv.{name}'
+            if k_key in state_dict and v_key in state_dict:
+                state_dict[f'{prefix}wkv.{name}'] = torch.cat(
+                    [state_dict.pop(k_key), state_dict.pop(v_key)], dim=0)
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+
     def forward(self, q, kv):
         b, t, j, d = q.shape
         t_sup = kv.shape[1]
         H = self.num_heads
         Cd = d // H
         q = self.wq(q).reshape(b, t, j, H, Cd).permute(0, 3, 2, 1, 4)
-        k = self.wk(kv).reshape(b, t_sup, j, H, Cd).permute(0, 3, 2, 1, 4)
-        v = self.wv(kv).reshape(b, t_sup, j, H, Cd).permute(0, 3, 2, 1, 4)
+        k, v = (self.wkv(kv)
+                .reshape(b, t_sup, j, 2, H, Cd)
+                .permute(3, 0, 4, 2, 1, 5))  # (2, b, H, j, t_sup, Cd)
+        if not self.back_att:
+            out = _sdpa(q, k, v, self.scale, self.attn_drop, self.training)
+            out = out.permute(0, 3, 2, 1, 4).reshape(b, t, j, d)
+            return self.proj_drop(self.proj(out))
+        # MIBlock needs the attention map itself, so it has to be materialized
         attn = self.attn_drop((q @ k.transpose(-2, -1) * self.scale).softmax(-1))
         out = (attn @ v).permute(0, 3, 2, 1, 4).reshape(b, t, j, d)
-        out = self.proj_drop(self.proj(out))
-        if self.back_att:
-            return attn, out
-        return out
+        return attn, self.proj_drop(self.proj(out))
 
 
 # ---------------------------------------------------------------------------
@@ -133,15 +199,22 @@ class Sum_Attention(nn.Module):
 
     def forward(self, x, att_map, weight):
         B, T, J, C = x.shape
-        qkv = (self.qkv(x)
-               .reshape(B, T, J, 3, self.num_heads, C // self.num_heads)
-               .permute(3, 0, 4, 1, 2, 5))
-        q, k, v = qkv[0], qkv[1], qkv[2]
-        B, H, T, J, C = q.shape
-        qt, kt, vt = (t.transpose(2, 3) for t in (q, k, v))
-        attn = self.attn_drop((qt @ kt.transpose(-2, -1) * self.scale).softmax(-1))
-        attn = self.attn_drop(weight * attn + (1 - weight) * att_map)
-        x = (attn @ vt).permute(0, 3, 2, 1, 4).reshape(B, T, J, C * H)
+        q, k, v = (self.qkv(x)
+                   .view(B, T, J, 3, self.num_heads, C // self.num_heads)
+                   .unbind(3))
+        H, C = q.shape[-2:]
+        # (B,H,J,T,C), matching the layout of att_map from CrossAttention
+        qt, kt, vt = (t.permute(0, 3, 2, 1, 4) for t in (q, k, v))
+        if self.training and self.attn_drop.p > 0:
+            attn = self.attn_drop((qt @ kt.transpose(-2, -1) * self.scale).softmax(-1))
+            attn = self.attn_drop(weight * attn + (1 - weight) * att_map)
+            x = attn @ vt
+        else:
+            # Without dropout (w*A + (1-w)*M) @ v splits into a fused SDPA term
+            # and the memory map term, so A is never materialized
+            x = (weight * _sdpa(qt, kt, vt, self.scale, self.attn_drop, False)
+                 + (1 - weight) * (att_map @ vt))
+        x = x.permute(0, 3, 2, 1, 4).reshape(B, T, J, C * H)
         return self.proj_drop(self.proj(x))
 
 
@@ -168,16 +241,9 @@ class MIBlock(nn.Module):
         self.norm_1 = nn.LayerNorm(dim)
         self.norm_2 = nn.LayerNorm(dim)
         self.drop_path = DropPath(drop_path) if drop_path > 0. else nn.Identity()
-        self.use_layer_scale = use_layer_scale
-        if use_layer_scale:
-            self.layer_scale_1 = nn.Parameter(layer_scale_init_value * torch.ones(dim))
-            self.layer_scale_2 = nn.Parameter(layer_scale_init_value * torch.ones(dim))
-            self.layer_scale_3 = nn.Parameter(layer_scale_init_value * torch.ones(dim))
-            self.layer_scale_4 = nn.Parameter(layer_scale_init_value * torch.ones(dim))
-            self.layer_scale_5 = nn.Parameter(layer_scale_init_value * torch.ones(dim))
-            self.layer_scale_6 = nn.Parameter(layer_scale_init_value * torch.ones(dim))
-            self.layer_scale_7 = nn.Parameter(layer_scale_init_value * torch.ones(dim))
-            self.layer_scale_8 = nn.Parameter(layer_scale_init_value * torch.ones(dim))
+        # Rows are upstream's layer_scale_1 .. layer_scale_8; each (dim,) row
+        # broadcasts against (B, T, J, C) directly
+        _register_layer_scale(self, 8, dim, use_layer_scale, layer_scale_init_value)
 
         self.norm_sa_self = nn.LayerNorm(dim)
         self.map_sa_self = Attention(dim, dim, num_heads, qkv_bias, qk_scale,
@@ -191,23 +257,34 @@ class MIBlock(nn.Module):
         self.mlp_sa = MLP(dim, mlp_hidden, act_layer=act_layer, drop=drop)
         self.sg = nn.Sigmoid()
         self.att_weight = nn.Parameter(torch.rand(1))
+        # sigmoid(att_weight), cached while in eval mode; a buffer so .to() moves it
+        self.register_buffer('_nw_cached', None, persistent=False)
+
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        _pack_legacy_scales(state_dict, prefix,
+                            [f'layer_scale_{i}' for i in range(1, 9)])
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+        self._nw_cached = None
+
+    def train(self, mode=True):
+        super().train(mode)
+        self._nw_cached = None if mode else self.sg(self.att_weight).detach()
+        return self
 
     def forward(self, x, pose_query):
-        if self.use_layer_scale:
-            _u = lambda s: s.unsqueeze(0).unsqueeze(0)
-            _u1 = lambda s: s.unsqueeze(0).unsqueeze(1)
-            attn1, o1 = self.center_full(self.norm_center(pose_query), self.norm_full(x))
-            pose_query = pose_query + self.drop_path(_u(self.layer_scale_1) * o1)
-            pose_query = pose_query + self.drop_path(_u(self.layer_scale_2) * self.mlp_1(self.norm_1(pose_query)))
-            attn2, o2 = self.full_center(self.norm_full(x), self.norm_center(pose_query))
-            x = x + self.drop_path(_u(self.layer_scale_3) * o2)
-            x = x + self.drop_path(_u(self.layer_scale_4) * self.mlp_2(self.norm_2(x)))
-            attn_map = attn2 @ attn1
-            nw = self.sg(self.att_weight)
-            x = x + self.drop_path(_u1(self.layer_scale_7) * self.map_sa_self(self.norm_sa_self(x)))
-            x = x + self.drop_path(_u1(self.layer_scale_8) * self.mlp_sa_self(self.norm_mlp_self(x)))
-            x = x + self.drop_path(_u1(self.layer_scale_5) * self.map_sum(self.norm_sa_1(x), attn_map, nw))
-            x = x + self.drop_path(_u1(self.layer_scale_6) * self.mlp_sa(self.norm_sa_2(x)))
+        x_ln = self.norm_full(x)  # x is unchanged until after full_center, so normalize once
+        attn1, o1 = self.center_full(self.norm_center(pose_query), x_ln)
+        pose_query = _residual(pose_query, self.layer_scale[0], o1, self.drop_path)
+        pose_query = _residual(pose_query, self.layer_scale[1], self.mlp_1(self.norm_1(pose_query)), self.drop_path)
+        attn2, o2 = self.full_center(x_ln, self.norm_center(pose_query))
+        x = _residual(x, self.layer_scale[2], o2, self.drop_path)
+        x = _residual(x, self.layer_scale[3], self.mlp_2(self.norm_2(x)), self.drop_path)
+        attn_map = attn2 @ attn1
+        nw = self.sg(self.att_weight) if self._nw_cached is None else self._nw_cached
+        x = _residual(x, self.layer_scale[6], self.map_sa_self(self.norm_sa_self(x)), self.drop_path)
+        x = _residual(x, self.layer_scale[7], self.mlp_sa_self(self.norm_mlp_self(x)), self.drop_path)
+        x = _residual(x, self.layer_scale[4], self.map_sum(self.norm_sa_1(x), attn_map, nw), self.drop_path)
+        x = _residual(x, self.layer_scale[5], self.mlp_sa(self.norm_sa_2(x)), self.drop_path)
         return x, pose_query
 
 
@@ -254,59 +331,42 @@ class TransBlock(nn.Module):
 
         self.mlp = MLP(dim, mlp_hidden, act_layer=act_layer, drop=drop)
         self.drop_path = DropPath(drop_path) if drop_path > 0. else nn.Identity()
-        self.use_layer_scale = use_layer_scale
-        if use_layer_scale:
-            self.layer_scale_1 = nn.Parameter(layer_scale_init_value * torch.ones(dim))
-            self.layer_scale_2 = nn.Parameter(layer_scale_init_value * torch.ones(dim))
+        # Rows are upstream's layer_scale_1 / layer_scale_2
+        _register_layer_scale(self, 2, dim, use_layer_scale, layer_scale_init_value)
+
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        _pack_legacy_scales(state_dict, prefix, ['layer_scale_1', 'layer_scale_2'])
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
 
     def forward(self, x):
         if self.mixer_type == 'crossattention':
             x = self._forward_local(x)
             length = x.shape[1] // 3
             return self._forward_cross(x, length)
-        _u = lambda s: s.unsqueeze(0).unsqueeze(0)
-        if self.use_layer_scale:
-            x = x + self.drop_path(_u(self.layer_scale_1) * self.mixer(self.norm1(x)))
-            x = x + self.drop_path(_u(self.layer_scale_2) * self.mlp(self.norm2(x)))
-        else:
-            x = x + self.drop_path(self.mixer(self.norm1(x)))
-            x = x + self.drop_path(self.mlp(self.norm2(x)))
+        x = _residual(x, self.layer_scale[0], self.mixer(self.norm1(x)), self.drop_path)
+        x = _residual(x, self.layer_scale[1], self.mlp(self.norm2(x)), self.drop_path)
         return x
 
     def _forward_cross(self, x, part_size):
         parts = [x[:, :part_size], x[:, part_size:2*part_size], x[:, 2*part_size:]]
-        kvs = [
-            torch.cat([parts[1], parts[2]], dim=1),
-            torch.cat([parts[0], parts[2]], dim=1),
-            torch.cat([parts[1], parts[2]], dim=1),
-        ]
-        _u = lambda s: s.unsqueeze(0).unsqueeze(0)
+        # Upstream uses parts 1+2 as the context for both parts 0 and 2
+        kv_12 = torch.cat([parts[1], parts[2]], dim=1)
+        kvs = [kv_12, torch.cat([parts[0], parts[2]], dim=1), kv_12]
+        ls1, ls2 = self.layer_scale  # row views taken once, not per sublayer
         for i in range(3):
-            if self.use_layer_scale:
-                parts[i] = parts[i] + self.drop_path(_u(self.layer_scale_1) * self.mixer[i](self.normq(parts[i]), self.normkv(kvs[i])))
-                parts[i] = parts[i] + self.drop_path(_u(self.layer_scale_1) * self.mlps[i](self.norms[i](parts[i])))
-            else:
-                parts[i] = parts[i] + self.drop_path(self.mixer[i](self.normq(parts[i]), self.normkv(kvs[i])))
-                parts[i] = parts[i] + self.drop_path(self.mlps[i](self.norms[i](parts[i])))
+            parts[i] = _residual(parts[i], ls1, self.mixer[i](self.normq(parts[i]), self.normkv(kvs[i])), self.drop_path)
+            parts[i] = _residual(parts[i], ls1, self.mlps[i](self.norms[i](parts[i])), self.drop_path)
         out = torch.cat(parts, dim=1)
-        if self.use_layer_scale:
-            out = out + self.drop_path(_u(self.layer_scale_1) * self.self_attention(self.norm1(out)))
-            out = out + self.drop_path(_u(self.layer_scale_2) * self.sa_mlp(self.norm2(out)))
-        else:
-            out = out + self.drop_path(self.self_attention(self.norm1(out)))
-            out = out + self.drop_path(self.sa_mlp(self.norm2(out)))
+        out = _residual(out, ls1, self.self_attention(self.norm1(out)), self.drop_path)
+        out = _residual(out, ls2, self.sa_mlp(self.norm2(out)), self.drop_path)
         return out
 
     def _forward_local(self, x):
         parts = list(torch.chunk(x, 3, dim=1))
-        _u = lambda s: s.unsqueeze(0).unsqueeze(0)
+        ls1, ls2 = self.layer_scale
         for i in range(3):
-            if self.use_layer_scale:
-                parts[i] = parts[i] + self.drop_path(_u(self.layer_scale_1) * self.local_attention_list[i](self.norm1(parts[i])))
-                parts[i] = parts[i] + self.drop_path(_u(self.layer_scale_2) * self.loacl_mlps[i](self.norm2(parts[i])))
-            else:
-                parts[i] = parts[i] + self.drop_path(self.local_attention_list[i](self.norm1(parts[i])))
-                parts[i] = parts[i] + self.drop_path(self.loacl_mlps[i](self.norm2(parts[i])))
+            parts[i] = _residual(parts[i], ls1, self.local_attention_list[i](self.norm1(parts[i])), self.drop_path)
+            parts[i] = _residual(parts[i], ls2, self.loacl_mlps[i](self.norm2(parts[i])), self.drop_path)
         return torch.cat(parts, dim=1)
 
 
@@ -360,13 +420,10 @@ class MemoryInducedBlock(nn.Module):
         self.loacl_mlps = nn.ModuleList([
             MLP(dim, mlp_hidden, act_layer=act_layer, drop=drop) for _ in range(3)
         ])
-        # Fix: use nn.ParameterList instead of plain list (upstream bug).
+        # Fix: register as a parameter instead of a plain list (upstream bug).
         # These are never saved in the original checkpoint; they always stay at
         # their init value (layer_scale_init_value = 1e-5).
-        self.layer_scale = nn.ParameterList([
-            nn.Parameter(layer_scale_init_value * torch.ones(dim))
-            for _ in range(6)
-        ])
+        self.layer_scale = nn.Parameter(layer_scale_init_value * torch.ones(6, dim))
         self.local_norms = nn.ModuleList([nn.LayerNorm(dim) for _ in range(6)])
         kw = dict(mlp_ratio=mlp_ratio, act_layer=act_layer, attn_drop=attn_drop,
                   drop=drop, drop_path=drop_path, num_heads=num_heads,
@@ -376,13 +433,29 @@ class MemoryInducedBlock(nn.Module):
                   n_frames=n_frames)
         self.cross_temporal = MIBlock(dim, mode='temporal', **kw)
 
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        # Checkpoints saved with the earlier ParameterList layout
+        _pack_legacy_scales(state_dict, prefix, [f'layer_scale.{i}' for i in range(6)])
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+
     def forward(self, x, pose_query):
-        parts = list(torch.chunk(x, 3, dim=1))
-        for i in range(3):
-            _u = lambda s: s.unsqueeze(0).unsqueeze(0)
-            parts[i] = parts[i] + self.drop_path(_u(self.layer_scale[i]) * self.local_attention_list[i](self.local_norms[i](parts[i])))
-            parts[i] = parts[i] + self.drop_path(_u(self.layer_scale[i + 3]) * self.loacl_mlps[i](self.local_norms[i + 3](parts[i])))
-        x = torch.cat(parts, dim=1)
+        if self.training or torch.is_grad_enabled() or torch.onnx.is_in_onnx_export():
+            parts = list(torch.chunk(x, 3, dim=1))
+            for i in range(3):
+                parts[i] = _residual(parts[i], self.layer_scale[i], self.local_attention_list[i](self.local_norms[i](parts[i])), self.drop_path)
+                parts[i] = _residual(parts[i], self.layer_scale[i + 3], self.loacl_mlps[i](self.local_norms[i + 3](parts[i])), self.drop_path)
+            x = torch.cat(parts, dim=1)
+        else:
+            # Inference: update the three segments in place on a single copy of x
+            # rather than chunk -> 6 residual tensors -> cat (autograd would
+            # reject the in-place writes and ONNX export should see the
+            # out-of-place graph, hence the branch)
+            x = x.clone()
+            step = -(-x.shape[1] // 3)  # same split sizes as torch.chunk
+            for i in range(3):
+                seg = x[:, i * step:(i + 1) * step]
+                seg.addcmul_(self.layer_scale[i], self.local_attention_list[i](self.local_norms[i](seg)))
+                seg.addcmul_(self.layer_scale[i + 3], self.loacl_mlps[i](self.local_norms[i + 3](seg)))
         return self.cross_temporal(x, pose_query)
 
 
@@ -436,11 +509,43 @@ class MemoryInducedTransformer(nn.Module):
             torch.randn(n_frames // 3, num_joints, dim_feat))
         self.center_pos_embed = nn.Parameter(
             torch.zeros(1, num_joints, dim_feat))
+        # ((device, dtype, param versions), center_pose + center_pos_embed),
+        # reused at inference and broadcast to each batch size as a view
+        self._pq_cache = None
+
+    def _load_from_state_dict(self, *args, **kwargs):
+        self._pq_cache = None
+        super()._load_from_state_dict(*args, **kwargs)
+
+    def _apply(self, fn, *args, **kwargs):
+        # .to() / .half() / .cuda() replace the parameters
+        self._pq_cache = None
+        return super()._apply(fn, *args, **kwargs)
+
+    def train(self, mode=True):
+        self._pq_cache = None
+        return super().train(mode)
+
+    def _pose_query(self, b, device):
+        if self.training or torch.is_grad_enabled() or torch.onnx.is_in_onnx_export():
+            return (self.center_pose.unsqueeze(0).expand(b, -1, -1, -1)
+                    + self.center_pos_embed)
+        key = (device, self.center_pose.dtype,
+               self.center_pose._version, self.center_pos_embed._version)
+        if self._pq_cache is None or self._pq_cache[0] != key:
+            self._pq_cache = (key, self.center_pose + self.center_pos_embed)
+        return self._pq_cache[1].unsqueeze(0).expand(b, -1, -1, -1)
 
     def forward(self, x):
-        b = x.shape[0]
-        pose_query = (self.center_pose.unsqueeze(0).expand(b, -1, -1, -1)
-                      + self.center_pos_embed)
+        if x.is_cuda:
+            # Linears/matmuls/attention run in half precision under autocast
+            # (LayerNorm and softmax stay FP32); hand back FP32 to callers
+            with torch.autocast('cuda', dtype=_cuda_half_dtype()):
+                return self._forward(x).float()
+        return self._forward(x)
+
+    def _forward(self, x):
+        pose_query = self._pose_query(x.shape[0], x.device)
         x = self.joints_embed(x) + self.pos_embed
         for layer, temporal_layer in zip(self.layers, self.temporal_layers):
             x = layer(x)
@@ -448,3 +553,51 @@ class MemoryInducedTransformer(nn.Module):
         x = self.norm(x)
         x = self.rep_logit(x)
         return self.head(x)
+
+
+# ---------------------------------------------------------------------------
+# Checkpoint loading
+# ---------------------------------------------------------------------------
+# Keys a checkpoint may legitimately lack: upstream kept MemoryInducedBlock's
+# layer scales in a plain list, so they were never saved and stay at init value
+_OPTIONAL_STATE_KEYS = re.compile(r'temporal_layers\.\d+\.layer_scale')
+
+
+def load_checkpoint(model: nn.Module, state_dict) -> nn.Module:
+    """Strictly load ``state_dict`` (packed or legacy layout) into ``model``.
+
+    The ``_load_from_state_dict`` hooks map the legacy ``wk``/``wv`` and
+    ``layer_scale_N`` / ``layer_scale.N`` keys first; any key they leave
+    unmapped raises instead of silently keeping its random init. Only the
+    keys matching ``_OPTIONAL_STATE_KEYS`` may be absent.
+    """
+    state_dict = dict(state_dict)
+    for key, value in model.state_dict().items():
+        if (_OPTIONAL_STATE_KEYS.fullmatch(key) and key not in state_dict
+                and f'{key}.0' not in state_dict):
+            state_dict[key] = value
+    model.load_state_dict(state_dict, strict=True)
+    return model
+
+
+# ---------------------------------------------------------------------------
+# CPU inference helpers
+# ---------------------------------------------------------------------------
+# Input embedding (3 features) and output projection stay FP32: they are tiny
+# and sit directly on the coordinates, where INT8 error is least affordable
+_FP32_LINEARS = frozenset({'joints_embed', 'head'})
+
+
+def quantize_for_cpu(model: nn.Module) -> nn.Module:
+    """Dynamically quantize the transformer's nn.Linear layers to INT8 for CPU inference.
+
+    Covers the attention qkv/wq/wkv/proj, MLP fc1/fc2 and rep_logit.fc; weights
+    are quantized once, activations per call. joints_embed and head are kept
+    in FP32. Uses the x86 (oneDNN/fbgemm) engine when available.
+    """
+    if 'x86' in torch.backends.quantized.supported_engines:
+        torch.backends.quantized.engine = 'x86'
+    qconfig = torch.ao.quantization.default_dynamic_qconfig
+    spec = {name: qconfig for name, module in model.named_modules()
+            if isinstance(module, nn.Linear) and name not in _FP32_LINEARS}
+    return torch.ao.quantization.quantize_dynamic(model, spec, dtype=torch.qint8)
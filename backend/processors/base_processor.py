@@ -3,6 +3,11 @@ from typing import Dict, Any, Optional
 import numpy as np
 import config as app_config
 
+def has_nan(frame: np.ndarray) -> bool:
+    """NaN check that skips the full-frame scan for integer (e.g. uint8 video) frames."""
+    return frame.dtype.kind in 'fc' and np.isnan(frame).any()
+
+
 class BaseProcessor(ABC):
     def __init__(self, processor_id: str, config: Optional[Dict[str, Any]] = None):
         self.processor_id = processor_id
@@ -25,3 +30,11 @@ class BaseProcessor(ABC):
     def is_initialized(self) -> bool:
         return self._is_initialized
 
+    def _reuse(self, attr: str, shape, dtype) -> np.ndarray:
+        """Return the buffer stored at ``attr``, reallocating only when the frame shape changes."""
+        buf = getattr(self, attr, None)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype)
+            setattr(self, attr, buf)
+        return buf
+
@@ -1,19 +1,18 @@
 from typing import Dict, Any, Optional
 import numpy as np
 from collections import deque
-import config
-from processors.base_processor import BaseProcessor
+from processors.base_processor import BaseProcessor, has_nan
 import cv2
 import logging
 logger = logging.getLogger(__name__)
 
+
 class DataProcessor(BaseProcessor):
     
     def __init__(self, processor_id: str, config_dict: Optional[Dict[str, Any]] = None):
         super().__init__(processor_id, config_dict)
-        self.processor_id = processor_id
-
-        self.config = config.merge_configs(config_dict)['data_processor']
+        # BaseProcessor already merged the defaults; keep only this stage's section
+        self.config = self.config['data_processor']
         logger.debug(f"[DATA] Data processor config: {self.config}")
         
         self.last_processed_time: float = 0.0
@@ -27,6 +26,14 @@ class DataProcessor(BaseProcessor):
         self.timestamp_buffer: deque = deque[float](maxlen=self.window_size)
 
         self.anchor_frame: np.ndarray = None
+
+        # Reusable output buffers, allocated on the first frame
+        self._window_out: Optional[np.ndarray] = None
+        self._diff_out: Optional[np.ndarray] = None
+        # Greyscale frames rotate through window_size + 1 buffers, so the slot
+        # being written is never one still referenced by frame_buffer
+        self._gray_bufs: list = []
+        self._gray_next: int = 0
         
     def initialize(self) -> bool:
         self._is_initialized = True
@@ -42,7 +49,7 @@ class DataProcessor(BaseProcessor):
         if not self._is_initialized:
             raise RuntimeError("Processor not initialized")            
 
-        if frame is None or np.isnan(frame).any():
+        if frame is None or has_nan(frame):
             return None
 
         if not self._fps_throttling(timestamp, self.config['target_fps']):
@@ -50,7 +57,7 @@ class DataProcessor(BaseProcessor):
         self.last_processed_time = timestamp
 
         if self.greyscale_enabled:
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            frame = self._to_gray(frame)
 
         self.timestamp_buffer.append(timestamp)
         self.frame_buffer.append(frame)
@@ -61,31 +68,47 @@ class DataProcessor(BaseProcessor):
     
     def get_output(self) -> np.ndarray:
 
+        # Outputs are written into buffers reused across frames; the pipeline
+        # consumes them before this stream's next frame is processed
+        newest = self.frame_buffer[-1]
         if self.preprocessing_mode == "sliding_window":
+            output = self._reuse('_window_out', (self.window_size, *newest.shape), newest.dtype)
+            np.stack(self.frame_buffer, out=output)
             if self.frame_differencing_enabled:
-                output = np.array(self.frame_buffer) - np.array(self.frame_buffer[0])
-            else:
-                output = np.array(self.frame_buffer)
+                # Subtract the buffered oldest frame, not output[0], which is overwritten in place
+                np.subtract(output, self.frame_buffer[0], out=output)
 
         if self.preprocessing_mode == "single_frame":
             if self.frame_differencing_enabled:
-                output = self.frame_buffer[-1] - self.frame_buffer[0]
+                output = self._reuse('_diff_out', newest.shape, newest.dtype)
+                np.subtract(newest, self.frame_buffer[0], out=output)
             else:
-                output = self.frame_buffer[-1]
+                output = newest
         
         return output
+
+    def _to_gray(self, frame: np.ndarray) -> np.ndarray:
+        shape = frame.shape[:2]
+        if not self._gray_bufs or self._gray_bufs[0].shape != shape:
+            self._gray_bufs = [np.empty(shape, np.uint8) for _ in range(self.window_size + 1)]
+        dst = self._gray_bufs[self._gray_next]
+        self._gray_next = (self._gray_next + 1) % len(self._gray_bufs)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=dst)
     
     def _is_ready(self) -> bool:
         if self.preprocessing_mode == "sliding_window":
-            return len(self.frame_buffer) == self.window_size and not np.isnan(self.frame_buffer[0]).any()
+            return len(self.frame_buffer) == self.window_size and not has_nan(self.frame_buffer[0])
         if self.preprocessing_mode == "single_frame":
-            return len(self.frame_buffer) >= 1 and not np.isnan(self.frame_buffer[0]).any()
+            return len(self.frame_buffer) >= 1 and not has_nan(self.frame_buffer[0])
         return False
 
     def cleanup(self):
         self.frame_buffer.clear()
         self.timestamp_buffer.clear()
         self.last_processed_time = 0.0
+        self._window_out = None
+        self._diff_out = None
+        self._gray_bufs = []
     
     def _fps_throttling(self, timestamp: float, target_fps: int) -> bool:
         return timestamp - self.last_processed_time >= 1.0 / target_fps
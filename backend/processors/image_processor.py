@@ -1,7 +1,7 @@
 from typing import Dict, Any, Optional
 import numpy as np
+import cv2
 import logging
-import config
 from processors.base_processor import BaseProcessor
 
 logger = logging.getLogger(__name__)
@@ -9,8 +9,6 @@ logger = logging.getLogger(__name__)
 class ImageProcessor(BaseProcessor):
     def __init__(self, processor_id: str, config_dict: Optional[Dict[str, Any]] = None):
         super().__init__(processor_id, config_dict)
-        self.processor_id = processor_id
-        self.config = config.merge_configs(config_dict)
         self.flip_horizontal = self.config['image_processor'].get('flip_horizontal', False)
 
     def initialize(self) -> bool:
@@ -23,7 +21,9 @@ class ImageProcessor(BaseProcessor):
             raise RuntimeError("Processor not initialized")
 
         if self.flip_horizontal:
-            return np.fliplr(frame)
+            # One SIMD pass into a contiguous frame; np.fliplr's negative-stride
+            # view forced a hidden copy in every downstream consumer
+            return cv2.flip(frame, 1)
         return frame
     
     def cleanup(self):
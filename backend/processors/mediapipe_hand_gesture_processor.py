@@ -11,10 +11,10 @@ import mediapipe as mp
 import numpy as np
 from typing import Dict, Any, Optional
 import logging
-import subprocess
 import os
 
-from processors.base_processor import BaseProcessor
+from processors.base_processor import BaseProcessor, has_nan
+from utils.download import download_file
 import config
 
 logger = logging.getLogger(__name__)
@@ -41,6 +41,7 @@ HAND_CONNECTIONS = frozenset([
     # Palm
     (5, 9), (9, 13), (13, 17),
 ])
+_HAND_EDGES = np.array(sorted(HAND_CONNECTIONS), dtype=np.intp)
 
 # Colors (BGR)
 _LEFT_HAND_COLOR = (180, 120, 0)   # dark teal
@@ -81,10 +82,7 @@ class MediaPipeHandGestureProcessor(BaseProcessor):
         if not os.path.exists(self.model_path):
             logger.info(f"Downloading gesture_recognizer model to "
                         f"{self.model_path}")
-            os.makedirs(os.path.dirname(self.model_path) or '.', exist_ok=True)
-            subprocess.run(
-                ["wget", "-O", self.model_path, _GESTURE_MODEL_URL],
-                check=True)
+            download_file(_GESTURE_MODEL_URL, self.model_path)
 
         running_mode = mp.tasks.vision.RunningMode.VIDEO
         logger.info(f"HandGesture running mode: {running_mode.name}")
@@ -139,7 +137,7 @@ class MediaPipeHandGestureProcessor(BaseProcessor):
                       timestamp_ms: int) -> Dict[str, Any]:
         if not self._is_initialized:
             raise RuntimeError("Processor not initialized")
-        if frame is None or np.isnan(frame).any():
+        if frame is None or has_nan(frame):
             return None
 
         # Monotonic timestamp enforcement
@@ -222,11 +220,12 @@ class MediaPipeHandGestureProcessor(BaseProcessor):
                 cv2.rectangle(
                     annotated, (bx1, by1), (bx2, by2), box_color, 2)
 
-                # Draw hand skeleton connections
-                for si, ei in HAND_CONNECTIONS:
-                    if si < len(pts) and ei < len(pts):
-                        cv2.line(annotated, pts[si], pts[ei],
-                                 _BONE_COLOR, 2, cv2.LINE_AA)
+                # Draw hand skeleton connections as two-point polylines in one call
+                pts_arr = np.array(pts, dtype=np.int32).reshape(-1, 2)
+                edges = _HAND_EDGES[(_HAND_EDGES < len(pts)).all(axis=1)]
+                if len(edges):
+                    cv2.polylines(annotated, pts_arr[edges], False,
+                                  _BONE_COLOR, 2, cv2.LINE_AA)
 
                 # Draw landmark joints
                 for px, py in pts:
@@ -10,12 +10,12 @@ import mediapipe as mp
 import numpy as np
 from typing import Dict, Any, Optional
 import logging
-import subprocess
 import os
 
-from processors.base_processor import BaseProcessor
+from processors.base_processor import BaseProcessor, has_nan
+from utils.download import download_file
 from processors.mediapipe_processor import MODEL_LINK
-import config
+import config as app_config
 
 logger = logging.getLogger(__name__)
 
@@ -52,9 +52,17 @@ class MediaPipeObjectDetectorProcessor(BaseProcessor):
         self.frame_height = int(pose_cfg.get('object_detector_frame_height', 480))
         self.min_detection_confidence = pose_cfg.get('min_detection_confidence', 0.5)
         self.max_results = int(pose_cfg.get('max_results', 10))
+        # Run the detector every N frames and redraw the last boxes in between;
+        # an empty result always triggers detection on the next frame
+        self.detector_interval = max(1, int(pose_cfg.get('object_detector_interval', 1)))
+        self._frame_idx = 0
+        self._last_result = None
         self.device = pose_cfg.get('device', 'cpu')
         self.object_detector = None
         self.last_timestamp = 0
+        # Scratch buffers reused across frames while the input shape is stable
+        self._resize_buf: Optional[np.ndarray] = None
+        self._rgb_buf: Optional[np.ndarray] = None
 
     def _get_delegate(self):
         if self.device == 'cuda':
@@ -63,21 +71,21 @@ class MediaPipeObjectDetectorProcessor(BaseProcessor):
         logger.info("ObjectDetector: using CPU delegate")
         return mp.tasks.BaseOptions.Delegate.CPU
 
-    def _try_initialize_with_delegate(self, delegate) -> bool:
+    def _try_initialize_with_delegate(self, delegate,
+                                      model_path: Optional[str] = None) -> bool:
         if not os.path.exists(self.model_path):
             model_url = MODEL_LINK.get(os.path.basename(self.model_path))
             if model_url is None:
                 raise ValueError(
                     f"No download URL for model {self.model_path}")
-            subprocess.run(
-                ["wget", "-O", self.model_path, model_url], check=True)
+            download_file(model_url, self.model_path)
 
         running_mode = mp.tasks.vision.RunningMode.VIDEO
         logger.info(f"ObjectDetector running mode: {running_mode.name}")
 
         od_kwargs = dict(
             base_options=mp.tasks.BaseOptions(
-                model_asset_path=self.model_path,
+                model_asset_path=model_path or self.model_path,
                 delegate=delegate),
             running_mode=running_mode,
             max_results=self.max_results,
@@ -87,20 +95,33 @@ class MediaPipeObjectDetectorProcessor(BaseProcessor):
                 mp.tasks.vision.ObjectDetectorOptions(**od_kwargs)))
         return True
 
+    def _initialize_cpu(self) -> bool:
+        """CPU delegate, preferring an INT8 model variant if one is present."""
+        int8_path = app_config.quantized_task_variant(self.model_path)
+        if int8_path:
+            try:
+                return self._try_initialize_with_delegate(
+                    mp.tasks.BaseOptions.Delegate.CPU, int8_path)
+            except Exception as int8_err:
+                logger.warning(
+                    f"ObjectDetector INT8 model {int8_path} failed "
+                    f"({int8_err}), using full-precision model")
+        return self._try_initialize_with_delegate(
+            mp.tasks.BaseOptions.Delegate.CPU)
+
     def initialize(self) -> bool:
         try:
             delegate = self._get_delegate()
-            try:
-                self._try_initialize_with_delegate(delegate)
-            except Exception as gpu_err:
-                if delegate == mp.tasks.BaseOptions.Delegate.GPU:
+            if delegate == mp.tasks.BaseOptions.Delegate.GPU:
+                try:
+                    self._try_initialize_with_delegate(delegate)
+                except Exception as gpu_err:
                     logger.warning(
                         f"ObjectDetector GPU delegate failed ({gpu_err}), "
                         "falling back to CPU")
-                    self._try_initialize_with_delegate(
-                        mp.tasks.BaseOptions.Delegate.CPU)
-                else:
-                    raise
+                    self._initialize_cpu()
+            else:
+                self._initialize_cpu()
             self._is_initialized = True
             logger.info(
                 f"ObjectDetector processor {self.processor_id} initialized")
@@ -114,6 +135,9 @@ class MediaPipeObjectDetectorProcessor(BaseProcessor):
         if self.object_detector:
             self.object_detector.close()
             self.object_detector = None
+        self._last_result = None
+        self._frame_idx = 0
+        self._resize_buf = self._rgb_buf = None
         self._is_initialized = False
         logger.info(
             f"ObjectDetector processor {self.processor_id} cleaned up")
@@ -122,7 +146,7 @@ class MediaPipeObjectDetectorProcessor(BaseProcessor):
                       timestamp_ms: int) -> Dict[str, Any]:
         if not self._is_initialized:
             raise RuntimeError("Processor not initialized")
-        if frame is None or np.isnan(frame).any():
+        if frame is None or has_nan(frame):
             return None
 
         # Monotonic timestamp enforcement
@@ -130,25 +154,32 @@ class MediaPipeObjectDetectorProcessor(BaseProcessor):
             timestamp_ms = self.last_timestamp + 1
         self.last_timestamp = timestamp_ms
 
-        # Convert to RGB
+        # Resize once to detector resolution, then convert the small image
+        # to RGB; the detector input and the annotated frame share it
+        size = (self.frame_width, self.frame_height)
+        small = frame
+        if frame.shape[1] != size[0] or frame.shape[0] != size[1]:
+            small = self._reuse('_resize_buf',
+                                (size[1], size[0], *frame.shape[2:]),
+                                frame.dtype)
+            cv2.resize(frame, size, dst=small)
+        annotated = self._reuse('_rgb_buf', (size[1], size[0], 3),
+                                frame.dtype)
         if len(frame.shape) == 2:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+            cv2.cvtColor(small, cv2.COLOR_GRAY2RGB, dst=annotated)
         else:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        # Create annotated frame at detector resolution
-        annotated = cv2.resize(
-            frame_rgb, (self.frame_width, self.frame_height)).copy()
+            cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=annotated)
 
-        # Create MediaPipe image
-        mp_image = mp.Image(
-            image_format=mp.ImageFormat.SRGB,
-            data=cv2.resize(frame_rgb,
-                            (self.frame_width, self.frame_height)))
+        # Create MediaPipe image; detection finishes before drawing starts
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=annotated)
 
         # Run detection (synchronous VIDEO mode)
-        object_result = self.object_detector.detect_for_video(
-            mp_image, timestamp_ms)
+        if (self._frame_idx % self.detector_interval == 0
+                or not (self._last_result and self._last_result.detections)):
+            self._last_result = self.object_detector.detect_for_video(
+                mp_image, timestamp_ms)
+        self._frame_idx += 1
+        object_result = self._last_result
 
         objects = []
         if object_result and object_result.detections:
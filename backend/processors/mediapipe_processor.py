@@ -1,12 +1,13 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, Tuple
 import logging
-from processors.base_processor import BaseProcessor
-import config
+from concurrent.futures import ThreadPoolExecutor
+from processors.base_processor import BaseProcessor, has_nan
 
 from utils.kinetic import Converter
+import config as app_config
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +60,70 @@ OUTPUT_LANDMARK_NAMES = {
     'leftToe': ['left_foot_index']
 }
 
+# Gather tables for OUTPUT_LANDMARK_NAMES. Single-source joints are copied straight
+# from _SINGLE_SRC; the rest (hipCentre, neck) average the landmarks in _MULTI_IDX[g]
+# with weights _MULTI_WEIGHTS[g] (1/n for used slots, 0 for padding)
+_LANDMARK_FIELDS = ("x", "y", "z", "visibility", "presence")
+_OUTPUT_NAMES = list(OUTPUT_LANDMARK_NAMES)
+_SOURCES = [[LANDMARK_INDEX_DICT[lm] for lm in v] for v in OUTPUT_LANDMARK_NAMES.values()]
+_SINGLE_ROWS = np.array([g for g, src in enumerate(_SOURCES) if len(src) == 1], dtype=np.intp)
+_SINGLE_SRC = np.array([src[0] for src in _SOURCES if len(src) == 1], dtype=np.intp)
+_MULTI_ROWS = np.array([g for g, src in enumerate(_SOURCES) if len(src) > 1], dtype=np.intp)
+_MULTI_WIDTH = max((len(src) for src in _SOURCES), default=1)
+_MULTI_IDX = np.zeros((len(_MULTI_ROWS), _MULTI_WIDTH), dtype=np.intp)
+_MULTI_WEIGHTS = np.zeros((len(_MULTI_ROWS), _MULTI_WIDTH), dtype=np.float32)
+for _m, _g in enumerate(_MULTI_ROWS):
+    _MULTI_IDX[_m, :len(_SOURCES[_g])] = _SOURCES[_g]
+    _MULTI_WEIGHTS[_m, :len(_SOURCES[_g])] = 1.0 / len(_SOURCES[_g])
+
+
+# (num_connections, 2) endpoint indices, so one gather yields every skeleton edge
+_CONNECTION_IDX = np.array(sorted(POSE_CONNECTIONS), dtype=np.intp)
+
+
+def _landmark_array(poses) -> np.ndarray:
+    """Pack MediaPipe poses into a (num_poses, num_landmarks, 5) array of _LANDMARK_FIELDS.
+
+    MediaPipe emits float32 landmarks, so float32 storage is lossless and halves the
+    bytes every later gather, FK and serialisation pass reads.
+    """
+    shape = (len(poses), len(MEDIAPIPE_LANDMARK_NAMES), len(_LANDMARK_FIELDS))
+    # fromiter with a known count fills one preallocated buffer, skipping the
+    # nested lists of tuples np.array would have to walk
+    values = (v for pose in poses for lm in pose
+              for v in (lm.x, lm.y, lm.z, lm.visibility, lm.presence))
+    return np.fromiter(values, dtype=np.float32, count=shape[0] * shape[1] * shape[2]).reshape(shape)
+
+
+def _aggregate_landmarks(arr: np.ndarray) -> np.ndarray:
+    """Average (..., num_landmarks, 5) landmarks into (..., len(_OUTPUT_NAMES), 5)."""
+    out = np.empty((*arr.shape[:-2], len(_OUTPUT_NAMES), arr.shape[-1]), dtype=arr.dtype)
+    out[..., _SINGLE_ROWS, :] = arr[..., _SINGLE_SRC, :]
+    out[..., _MULTI_ROWS, :] = np.einsum('gk,...gkf->...gf', _MULTI_WEIGHTS, arr[..., _MULTI_IDX, :])
+    return out
+
+
+def _landmarks_to_dicts(joints: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """API-boundary adapter: {output name: {field: value}} for one aggregated pose."""
+    return {name: dict(zip(_LANDMARK_FIELDS, row))
+            for name, row in zip(_OUTPUT_NAMES, joints.tolist())}
+
+
+_HIP_CENTRE = _OUTPUT_NAMES.index('hipCentre')
+# MediaPipe (Y-down, Z-forward) -> Three.js (Y-up, Z-backward), per _LANDMARK_FIELDS column
+_TO_THREEJS = np.array([1.0, -1.0, -1.0, 1.0, 1.0])
+
+
+def _as_mp_image(rgb: np.ndarray) -> mp.Image:
+    """Wrap an RGB frame as an SRGB mp.Image, converting only when it is not C-contiguous uint8.
+
+    The resize/cvtColor scratch buffers already satisfy this, so the common
+    path hands the array to MediaPipe without an extra copy.
+    """
+    if rgb.dtype != np.uint8 or not rgb.flags['C_CONTIGUOUS']:
+        rgb = np.ascontiguousarray(rgb, dtype=np.uint8)
+    return mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+
 
 MODEL_LINK = {
     "efficientdet_lite0.tflite": "https://storage.googleapis.com/mediapipe-models/object_detector/efficientdet_lite0/float16/latest/efficientdet_lite0.tflite",
@@ -69,8 +134,6 @@ MODEL_LINK = {
 class MediaPipeProcessor(BaseProcessor):
     def __init__(self, processor_id: str, config_dict: Optional[Dict[str, Any]] = None):
         super().__init__(processor_id, config_dict)
-        self.processor_id = processor_id
-        self.config = config.merge_configs(config_dict)
         pose_processor_config = self.config['pose_processor']
         self.pose_landmarker_model_path = pose_processor_config['pose_landmarker_model_name']
         self.min_detection_confidence = pose_processor_config['min_detection_confidence']
@@ -78,10 +141,23 @@ class MediaPipeProcessor(BaseProcessor):
         self.min_presence_confidence = pose_processor_config['min_presence_confidence']
         self.pose_landmarker_frame_width = pose_processor_config['pose_landmarker_frame_width']
         self.pose_landmarker_frame_height = pose_processor_config['pose_landmarker_frame_height']
+        self._pose_size = (self.pose_landmarker_frame_width, self.pose_landmarker_frame_height)
         self.num_poses = pose_processor_config['num_poses']
         self.device = pose_processor_config.get('device', 'cpu')
         self.landmarker = None
+        self._detect = None  # bound landmarker.detect_for_video
+        # FK runs here while the frame is drawn; cv2 drawing releases the GIL
+        self._fk_pool: Optional[ThreadPoolExecutor] = None
+        self._converter = Converter()
         self.last_timestamp = 0
+        # cv2.cuda scratch state for resize + colour conversion; None means the CPU path
+        self._cuda_stream = None
+        self._gpu_src = self._gpu_small = self._gpu_rgb = None
+        self._host_rgb: Optional[np.ndarray] = None
+        self._host_mem = None  # page-locked backing store for _host_rgb
+        # CPU-path scratch buffers, reused across frames while the input shape is stable
+        self._resize_buf: Optional[np.ndarray] = None
+        self._rgb_buf: Optional[np.ndarray] = None
 
     def _get_delegate(self) -> 'mp.tasks.BaseOptions.Delegate':
         """Return GPU delegate if device is cuda, otherwise CPU."""
@@ -91,14 +167,34 @@ class MediaPipeProcessor(BaseProcessor):
         logger.info("MediaPipe: using CPU delegate")
         return mp.tasks.BaseOptions.Delegate.CPU
 
-    def _try_initialize_with_delegate(self, delegate) -> bool:
+    def _init_cuda_preprocess(self) -> None:
+        """Enable the cv2.cuda resize/cvtColor path when OpenCV was built with CUDA."""
+        if self.device != 'cuda':
+            return
+        try:
+            if cv2.cuda.getCudaEnabledDeviceCount() == 0:
+                return
+        except (AttributeError, cv2.error):
+            return
+        self._cuda_stream = cv2.cuda_Stream()
+        self._gpu_src, self._gpu_small, self._gpu_rgb = cv2.cuda_GpuMat(), cv2.cuda_GpuMat(), cv2.cuda_GpuMat()
+        width, height = self._pose_size
+        try:
+            # Pinned host memory lets the stream download run as a true async DMA
+            self._host_mem = cv2.cuda.HostMem(height, width, cv2.CV_8UC3, cv2.cuda.HostMem_PAGE_LOCKED)
+            self._host_rgb = self._host_mem.createMatHeader()
+        except (AttributeError, cv2.error):
+            self._host_rgb = np.empty((height, width, 3), np.uint8)
+        logger.info("MediaPipe: using cv2.cuda for input resize and colour conversion")
+
+    def _try_initialize_with_delegate(self, delegate, model_path: Optional[str] = None) -> bool:
         """Attempt to create MediaPipe PoseLandmarker with the given delegate."""
         running_mode = mp.tasks.vision.RunningMode.VIDEO
         logger.info(f"MediaPipe running mode: {running_mode.name}")
 
         lm_kwargs = dict(
             base_options=mp.tasks.BaseOptions(
-                model_asset_path=self.pose_landmarker_model_path,
+                model_asset_path=model_path or self.pose_landmarker_model_path,
                 delegate=delegate),
             running_mode=running_mode,
             num_poses=self.num_poses,
@@ -108,20 +204,33 @@ class MediaPipeProcessor(BaseProcessor):
             output_segmentation_masks=False)
         self.landmarker = mp.tasks.vision.PoseLandmarker.create_from_options(
             mp.tasks.vision.PoseLandmarkerOptions(**lm_kwargs))
+        self._detect = self.landmarker.detect_for_video
         return True
 
+    def _initialize_cpu(self) -> bool:
+        """CPU delegate, preferring an INT8 model variant placed next to the configured model."""
+        int8_path = app_config.quantized_task_variant(self.pose_landmarker_model_path)
+        if int8_path:
+            try:
+                return self._try_initialize_with_delegate(mp.tasks.BaseOptions.Delegate.CPU, int8_path)
+            except Exception as int8_err:
+                logger.warning(f"MediaPipe INT8 model {int8_path} failed ({int8_err}), using full-precision model")
+        return self._try_initialize_with_delegate(mp.tasks.BaseOptions.Delegate.CPU)
+
     def initialize(self) -> bool:
         try:
             delegate = self._get_delegate()
-            try:
-                self._try_initialize_with_delegate(delegate)
-            except Exception as gpu_err:
-                if delegate == mp.tasks.BaseOptions.Delegate.GPU:
+            if delegate == mp.tasks.BaseOptions.Delegate.GPU:
+                try:
+                    self._try_initialize_with_delegate(delegate)
+                except Exception as gpu_err:
                     logger.warning(f"MediaPipe GPU delegate failed ({gpu_err}), falling back to CPU")
-                    self._try_initialize_with_delegate(mp.tasks.BaseOptions.Delegate.CPU)
-                else:
-                    raise
+                    self._initialize_cpu()
+            else:
+                self._initialize_cpu()
 
+            self._init_cuda_preprocess()
+            self._fk_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"fk-{self.processor_id}")
             self._is_initialized = True
             logger.info(f"MediaPipe processor {self.processor_id} initialized")
             return True
@@ -129,120 +238,121 @@ class MediaPipeProcessor(BaseProcessor):
             logger.error(f"Failed to initialize MediaPipe processor {self.processor_id}: {e}")
             return False
     
+    @staticmethod
+    def _resize(frame: np.ndarray, width: int, height: int) -> np.ndarray:
+        if frame.shape[1] == width and frame.shape[0] == height:
+            return frame
+        return cv2.resize(frame, (width, height))
+
     def _mp_image_from_frame(self, frame: np.ndarray, width: int, height: int) -> mp.Image:
-        frame = cv2.resize(frame, (width, height))
-        return mp.Image(image_format=mp.ImageFormat.SRGB, data=frame)
+        return _as_mp_image(self._resize(frame, width, height))
+
+    def _prepare_pose_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Resize to the landmarker size and return (RGB landmarker input, BGR frame to draw on).
 
-    def _check_greyscale(self, frame: np.ndarray) -> bool:
+        The resized BGR buffer is annotated directly when it is private to this
+        processor, so the drawn frame needs no RGB -> BGR pass back; otherwise a
+        BGR copy is converted from the RGB image.
+        """
+        width, height = self._pose_size
+        if self._cuda_stream is None:
+            small = frame
+            if frame.shape[1] != width or frame.shape[0] != height:
+                small = self._reuse('_resize_buf', (height, width, *frame.shape[2:]), frame.dtype)
+                cv2.resize(frame, (width, height), dst=small)
+            rgb = self._check_greyscale(small, self._reuse('_rgb_buf', (height, width, 3), frame.dtype))
+            if small is not frame and len(small.shape) == 3:
+                return rgb, small
+            return rgb, cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+        stream = self._cuda_stream
+        self._gpu_src.upload(frame, stream)
+        src = self._gpu_src
+        if frame.shape[1] != width or frame.shape[0] != height:
+            src = cv2.cuda.resize(src, (width, height), self._gpu_small, stream=stream)
+        code = cv2.COLOR_GRAY2RGB if len(frame.shape) == 2 else cv2.COLOR_BGR2RGB
+        cv2.cuda.cvtColor(src, code, self._gpu_rgb, stream=stream)
+        self._gpu_rgb.download(stream, self._host_rgb)
+        stream.waitForCompletion()
+        return self._host_rgb, cv2.cvtColor(self._host_rgb, cv2.COLOR_RGB2BGR)
+
+    def _check_greyscale(self, frame: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
         if len(frame.shape) == 2:
-            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB, dst=dst)
         else:
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=dst)
         return frame
 
     def process_frame(self, frame: np.ndarray, timestamp_ms: int) -> Dict[str, Any]:
         if not self._is_initialized:
             raise RuntimeError("Processor not initialized")
 
-        if frame is None or np.isnan(frame).any():
+        if frame is None or has_nan(frame):
             return None
         
         if timestamp_ms <= self.last_timestamp:
             timestamp_ms = self.last_timestamp + 1
         self.last_timestamp = timestamp_ms
         
-        frame = self._check_greyscale(frame)
-        annotated_frame = cv2.resize(frame, (self.pose_landmarker_frame_width, self.pose_landmarker_frame_height)).copy()
+        # Resize once, then colour-convert the small image rather than the full-resolution
+        # input. Overlays are drawn in BGR (the colours below are BGR) on a frame the
+        # caller may keep until the stream's next frame, as with DataProcessor outputs
+        pose_frame, annotated_frame = self._prepare_pose_frame(frame)
         
-        mp_pose_image = self._mp_image_from_frame(frame, self.pose_landmarker_frame_width, self.pose_landmarker_frame_height)
+        mp_pose_image = self._mp_image_from_frame(pose_frame, *self._pose_size)
 
-        pose_result = self.landmarker.detect_for_video(mp_pose_image, timestamp_ms)
+        pose_result = self._detect(mp_pose_image, timestamp_ms)
         
-        landmarks, world_landmarks = [], []
+        image_poses = (pose_result.pose_landmarks if pose_result else None) or []
+        world_poses = (pose_result.pose_world_landmarks if pose_result else None) or []
 
-        if pose_result and pose_result.pose_landmarks:
+        # Image and world poses are packed together so one gather aggregates both;
+        # each pose stays a (joints, fields) array until the payload dicts are built
+        packed = _landmark_array(image_poses + world_poses)
+        joints = _aggregate_landmarks(packed)
+        landmarks, world_landmarks = joints[:len(image_poses)], joints[len(image_poses):]
+        primary_world = world_landmarks[0] if len(world_landmarks) else None
+        fk_future = self._fk_pool.submit(self._fk_processing, primary_world)
+
+        if image_poses:
             h, w, _ = annotated_frame.shape
-            landmark_dict = {}
-            for pose_landmarks in pose_result.pose_landmarks:
-                for output_landmark_name, mediapipe_landmark_names in OUTPUT_LANDMARK_NAMES.items():
-                    landmark_dict[output_landmark_name] = {"x": float(np.mean([pose_landmarks[LANDMARK_INDEX_DICT[lm]].x for lm in mediapipe_landmark_names])),
-                                                        "y": float(np.mean([pose_landmarks[LANDMARK_INDEX_DICT[lm]].y for lm in mediapipe_landmark_names])),
-                                                        "z": float(np.mean([pose_landmarks[LANDMARK_INDEX_DICT[lm]].z for lm in mediapipe_landmark_names])),
-                                                        "visibility": float(np.mean([pose_landmarks[LANDMARK_INDEX_DICT[lm]].visibility for lm in mediapipe_landmark_names])),
-                                                        "presence": float(np.mean([pose_landmarks[LANDMARK_INDEX_DICT[lm]].presence for lm in mediapipe_landmark_names])),
-                                                        }
-                landmarks.append(landmark_dict)
-            
-                for landmark in pose_landmarks:
-                    cv2.circle(annotated_frame, (int(landmark.x * w), int(landmark.y * h)), 5, (0, 255, 0), -1)
-                for start_idx, end_idx in POSE_CONNECTIONS:
-                    if start_idx < len(pose_landmarks) and end_idx < len(pose_landmarks):
-                        cv2.line(annotated_frame, (int(pose_landmarks[start_idx].x * w), int(pose_landmarks[start_idx].y * h)),
-                                (int(pose_landmarks[end_idx].x * w), int(pose_landmarks[end_idx].y * h)), (255, 0, 0), 2)
-        
-        if pose_result and pose_result.pose_world_landmarks:
-            for world_pose_landmarks in pose_result.pose_world_landmarks:
-                world_landmark_dict = {}
-                for output_landmark_name, mediapipe_landmark_names in OUTPUT_LANDMARK_NAMES.items():
-                    world_landmark_dict[output_landmark_name] = {"x": float(np.mean([world_pose_landmarks[LANDMARK_INDEX_DICT[lm]].x for lm in mediapipe_landmark_names])),
-                                                        "y": float(np.mean([world_pose_landmarks[LANDMARK_INDEX_DICT[lm]].y for lm in mediapipe_landmark_names])),
-                                                        "z": float(np.mean([world_pose_landmarks[LANDMARK_INDEX_DICT[lm]].z for lm in mediapipe_landmark_names])),
-                                                        "visibility": float(np.mean([world_pose_landmarks[LANDMARK_INDEX_DICT[lm]].visibility for lm in mediapipe_landmark_names])),
-                                                        "presence": float(np.mean([world_pose_landmarks[LANDMARK_INDEX_DICT[lm]].presence for lm in mediapipe_landmark_names])),
-                                                        }
-                world_landmarks.append(world_landmark_dict)
+            # Round (not truncate) every pose's landmarks to the nearest pixel in one pass
+            pixels = np.rint(packed[:len(image_poses), :, :2] * (w, h)).astype(np.int32)
+            for xy in pixels:
+                for x, y in xy.tolist():
+                    cv2.circle(annotated_frame, (x, y), 5, (0, 255, 0), -1)
+                # Each edge is a two-point open polyline, so the skeleton is one OpenCV call
+                cv2.polylines(annotated_frame, xy[_CONNECTION_IDX], False, (0, 0, 255), 2)
         
         # Get root position from hip center
         root_position = None
-        if world_landmarks and len(world_landmarks) > 0:
-            hip_data = world_landmarks[0].get("hipCentre", {})
-            if hip_data:
-                # Transform from MediaPipe (Y-down, Z-forward) to Three.js (Y-up, Z-backward)
-                root_position = {
-                    "x": float(hip_data.get("x", 0)),
-                    "y": float(-hip_data.get("y", 0)),
-                    "z": float(-hip_data.get("z", 0))
-                }
-        
-        # Convert back to BGR for cv2.imencode in websocket handler
-        annotated_frame = cv2.cvtColor(annotated_frame, cv2.COLOR_RGB2BGR)
+        if primary_world is not None:
+            hip_x, hip_y, hip_z = (primary_world[_HIP_CENTRE, :3] * _TO_THREEJS[:3]).tolist()
+            root_position = {"x": hip_x, "y": hip_y, "z": hip_z}
+
 
         return {
             "processed_frame": annotated_frame,
             "data": {
-                "landmarks": landmarks,
-                "world_landmarks": world_landmarks,
-                "fk_data": self._fk_processing(world_landmarks),
+                "landmarks": [_landmarks_to_dicts(pose) for pose in landmarks],
+                "world_landmarks": [_landmarks_to_dicts(pose) for pose in world_landmarks],
+                "fk_data": fk_future.result(),
                 "root_position": root_position,
-                "num_poses": len(pose_result.pose_landmarks) if pose_result and pose_result.pose_landmarks else 0},
+                "num_poses": len(image_poses)},
             "timestamp_ms": timestamp_ms,
             "processor_id": self.processor_id
         }
 
-    def _fk_processing(self, world_landmarks: List[Dict[str, float]]) -> Dict[str, float]:
-        if world_landmarks:
-            # Transform coordinates from MediaPipe (Y-down, Z-forward) to Three.js (Y-up, Z-backward)
-            transformed = {}
-            for joint_name, joint_data in world_landmarks[0].items():
-                if isinstance(joint_data, dict) and all(k in joint_data for k in ["x", "y", "z"]):
-                    transformed[joint_name] = {
-                        "x": float(joint_data["x"]),
-                        "y": float(-joint_data["y"]),
-                        "z": float(-joint_data["z"]),
-                        "visibility": float(joint_data.get("visibility", 0.0)),
-                        "presence": float(joint_data.get("presence", 0.0)),
-                    }
-                else:
-                    transformed[joint_name] = joint_data
-            converter = Converter()
-            fk_data = converter.coordinate2angle(transformed)
-            for joint_name, quat_data in fk_data.items():
-                if isinstance(quat_data, dict):
-                    original_joint = world_landmarks[0].get(joint_name, {})
-                    visibility = original_joint.get("visibility", 0.0) if isinstance(original_joint, dict) else 0.0
-                    quat_data["visibility"] = float(visibility)
-        else:
-            fk_data = {}
+    def _fk_processing(self, world_joints: Optional[np.ndarray]) -> Dict[str, float]:
+        if world_joints is None:
+            return {}
+        # Transform coordinates from MediaPipe (Y-down, Z-forward) to Three.js (Y-up, Z-backward)
+        transformed = _landmarks_to_dicts(world_joints * _TO_THREEJS)
+        fk_data = self._converter.coordinate2angle(transformed)
+        visibility = dict(zip(_OUTPUT_NAMES, world_joints[:, 3].tolist()))
+        for joint_name, quat_data in fk_data.items():
+            if isinstance(quat_data, dict):
+                quat_data["visibility"] = visibility.get(joint_name, 0.0)
         return fk_data
 
 
@@ -250,6 +360,14 @@ class MediaPipeProcessor(BaseProcessor):
         if self.landmarker:
             self.landmarker.close()
             self.landmarker = None
+        self._detect = None
+        if self._fk_pool is not None:
+            self._fk_pool.shutdown(wait=True)
+            self._fk_pool = None
+        self._cuda_stream = None
+        self._gpu_src = self._gpu_small = self._gpu_rgb = None
+        self._host_rgb = self._host_mem = None
+        self._resize_buf = self._rgb_buf = None
         self._is_initialized = False
         logger.info(f"MediaPipe processor {self.processor_id} cleaned up")
 
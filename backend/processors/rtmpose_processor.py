@@ -1,9 +1,16 @@
 import cv2
-from rtmlib import PoseTracker, Wholebody3d, draw_skeleton
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from rtmlib import PoseTracker, Wholebody3d, YOLOX, RTMPose3d, draw_skeleton
+from rtmlib.tools.base import BaseTool
+from rtmlib.tools.file import download_checkpoint
 from typing import Optional, List, Dict, Any
-from processors.base_processor import BaseProcessor
+from processors.base_processor import BaseProcessor, has_nan
 from utils.kinetic import Converter
 from utils.filters import MedianFilter
+import config as app_config
 import logging
 import numpy as np
 
@@ -38,6 +45,49 @@ COCO133_TO_OUTPUT_JOINTS = {
     'rightPinky': [132],    # right hand pinky tip (112+20)
 }
 
+# Gather table for COCO133_TO_OUTPUT_JOINTS: row g averages the keypoints in
+# _JOINT_IDX[g] where _JOINT_USED[g] is set (padding slots are unused)
+_LANDMARK_FIELDS = ("x", "y", "z", "visibility", "presence")
+_OUTPUT_NAMES = list(COCO133_TO_OUTPUT_JOINTS)
+_JOINT_WIDTH = max(len(v) for v in COCO133_TO_OUTPUT_JOINTS.values())
+_JOINT_IDX = np.zeros((len(_OUTPUT_NAMES), _JOINT_WIDTH), dtype=np.intp)
+_JOINT_USED = np.zeros((len(_OUTPUT_NAMES), _JOINT_WIDTH), dtype=bool)
+for _g, _indices in enumerate(COCO133_TO_OUTPUT_JOINTS.values()):
+    _JOINT_IDX[_g, :len(_indices)] = _indices
+    _JOINT_USED[_g, :len(_indices)] = True
+_HIP_INDICES = [11, 12]
+
+
+@lru_cache(maxsize=None)
+def _joint_gather(num_kpts: int):
+    """(indices, weights) for a model emitting ``num_kpts`` keypoints.
+
+    Keypoints beyond the model's range are dropped from their group; a group
+    left with none gets all-zero weights, i.e. an all-zero joint.
+    """
+    valid = _JOINT_USED & (_JOINT_IDX < num_kpts)
+    counts = valid.sum(axis=1, keepdims=True)
+    weights = np.where(valid, 1.0 / np.maximum(counts, 1), 0.0)
+    return np.where(valid, _JOINT_IDX, 0), weights
+
+
+def _aggregate_joints(feats: np.ndarray) -> np.ndarray:
+    """Average (..., num_kpts, 5) keypoint features into (..., len(_OUTPUT_NAMES), 5)."""
+    idx, weights = _joint_gather(feats.shape[-2])
+    return np.einsum('gk,...gkf->...gf', weights, feats[..., idx, :])
+
+
+def _joints_to_dicts(joints: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """{output name: {field: value}} for one aggregated pose."""
+    return {name: dict(zip(_LANDMARK_FIELDS, row))
+            for name, row in zip(_OUTPUT_NAMES, joints.tolist())}
+
+
+def _draw_annotated(frame: np.ndarray, keypoints_2d, scores) -> np.ndarray:
+    """Draw the skeleton onto ``frame`` in place and return it at preview resolution."""
+    return cv2.resize(draw_skeleton(frame, keypoints_2d, scores, kpt_thr=0.5), (640, 480))
+
+
 # RTMPose3D model constants for 3D coordinate normalization
 # Official codec: input_size=(288, 384, 288), z_range=2.1744869
 # rtmlib bug: z decoded using image height (384) instead of z input size (288).
@@ -46,52 +96,223 @@ COCO133_TO_OUTPUT_JOINTS = {
 # with approximate perspective unprojection to get consistent metric coordinates.
 _Z_RANGE = 2.1744869      # dataset statistic: max root-relative depth in meters
 _Z_INPUT_HALF = 144.0     # codec input_size[2] / 2 = 288 / 2 (z dimension)
+_Z_COEF = _Z_RANGE / _Z_INPUT_HALF
 _TORSO_LEG_HEIGHT = 1.35  # approximate shoulder-to-ankle height in meters
 
 
+# ONNX Runtime sessions shared by every RTMPose processor with the same model
+# and providers. InferenceSession.run is thread-safe, so concurrent streams can
+# use one session; per-stream state (tracker bboxes, IOBinding) stays per processor.
+_SESSION_POOL: Dict[tuple, Any] = {}
+_SESSION_POOL_LOCK = threading.Lock()
+
+
+def _shared_session(onnx_model: str, sess_options, providers: list):
+    """Return the pooled InferenceSession for (model, providers), creating it once."""
+    import onnxruntime as ort
+    key = (onnx_model, repr(providers))
+    with _SESSION_POOL_LOCK:
+        session = _SESSION_POOL.get(key)
+        if session is None:
+            session = ort.InferenceSession(
+                onnx_model, sess_options=sess_options, providers=providers)
+            _SESSION_POOL[key] = session
+        return session
+
+
+class _DeferredSessionTool(BaseTool):
+    """Stand-in for BaseTool.__init__ that records the model but opens no session.
+
+    Mixed in behind rtmlib's YOLOX / RTMPose3d, so their own __init__ still runs
+    while ``session`` is left for _configure_onnx_sessions to take from
+    _SESSION_POOL; a new stream therefore never loads a private copy of the models.
+    """
+
+    def __init__(self, onnx_model: str, model_input_size: tuple = None,
+                 mean: tuple = None, std: tuple = None,
+                 backend: str = 'onnxruntime', device: str = 'cpu'):
+        if not os.path.exists(onnx_model):
+            onnx_model = download_checkpoint(onnx_model)
+        self.session = None
+        self.onnx_model = onnx_model
+        self.model_input_size = model_input_size
+        self.mean = mean
+        self.std = std
+        self.backend = backend
+        self.device = device
+
+
+class _PooledYOLOX(YOLOX, _DeferredSessionTool):
+    pass
+
+
+class _PooledRTMPose3d(RTMPose3d, _DeferredSessionTool):
+    pass
+
+
+# PoseTracker picks the 3D output signature by type(pose_model).__name__
+_PooledRTMPose3d.__name__ = 'RTMPose3d'
+
+
+class _PooledWholebody3d(Wholebody3d):
+    """Wholebody3d whose detector and pose model are built without ONNX sessions."""
+
+    def __init__(self, det: str = None, det_input_size: tuple = (640, 640),
+                 pose: str = None, pose_input_size: tuple = (288, 384),
+                 mode: str = 'balanced', to_openpose: bool = False,
+                 backend: str = 'onnxruntime', device: str = 'cpu'):
+        if det is None:
+            det = self.MODE[mode]['det']
+            det_input_size = self.MODE[mode]['det_input_size']
+        if pose is None:
+            pose = self.MODE[mode]['pose']
+            pose_input_size = self.MODE[mode]['pose_input_size']
+        self.det_model = _PooledYOLOX(det, model_input_size=det_input_size,
+                                      backend=backend, device=device)
+        self.pose_model = _PooledRTMPose3d(pose, model_input_size=pose_input_size,
+                                           to_openpose=to_openpose,
+                                           backend=backend, device=device)
+
+
+class _IOBindingSession:
+    """InferenceSession wrapper that runs through a persistent CUDA IOBinding.
+
+    The input OrtValue lives on the device and is updated in place each call,
+    and outputs stay bound to device memory, so ORT does not allocate and stage
+    fresh host/device buffers on every frame. Exposes the subset of the
+    InferenceSession API that rtmlib uses.
+    """
+
+    def __init__(self, session):
+        import onnxruntime as ort
+        self._ort = ort
+        self._session = session
+        self._binding = session.io_binding()
+        self._input_value = None
+        self._output_names = [o.name for o in session.get_outputs()]
+        for name in self._output_names:
+            self._binding.bind_output(name, 'cuda')
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def run(self, output_names, input_feed, run_options=None):
+        (input_name, arr), = input_feed.items()
+        arr = np.ascontiguousarray(arr, dtype=np.float32)
+        if self._input_value is None or self._input_value.shape() != list(arr.shape):
+            self._input_value = self._ort.OrtValue.ortvalue_from_numpy(arr, 'cuda', 0)
+            self._binding.bind_ortvalue_input(input_name, self._input_value)
+        else:
+            self._input_value.update_inplace(arr)
+        self._session.run_with_iobinding(self._binding, run_options)
+        outputs = self._binding.copy_outputs_to_cpu()
+        if output_names:
+            return [outputs[self._output_names.index(n)] for n in output_names]
+        return outputs
+
+
 class RTMPoseProcessor(BaseProcessor):
     def __init__(self, processor_id: str, config_dict: Optional[Dict[str, Any]] = None):
         super().__init__(processor_id, config_dict)
         pose_processor_config = self.config['pose_processor']
         self.backend = pose_processor_config.get('backend', 'onnxruntime')
         self.device = pose_processor_config.get('device', 'cpu')
+        self.mode = pose_processor_config.get('mode', 'balanced')
+        # Draw the skeleton on the returned frame; off for FK-only clients
+        self.annotate = pose_processor_config.get('annotate', True)
+        self.onnx_providers = (pose_processor_config.get('onnx_providers')
+                               or app_config.get_onnx_providers(self.device))
+        self._converter = Converter()
+        self._contig_buf: Optional[np.ndarray] = None
+        self._draw_pool: Optional[ThreadPoolExecutor] = None
 
     def initialize(self) -> bool:
         self._is_initialized = True
+        # With onnxruntime the sessions come from _SESSION_POOL (see
+        # _configure_onnx_sessions), so rtmlib must not open its own
+        solution = _PooledWholebody3d if self.backend == 'onnxruntime' else Wholebody3d
         self.pose_tracker = PoseTracker(
-            Wholebody3d,
+            solution,
             det_frequency=7,
             tracking=False,
-            mode='balanced',
+            mode=self.mode,
             to_openpose=False,
             backend=self.backend,
             device=self.device
         )
+        if self.backend == 'onnxruntime':
+            self._configure_onnx_sessions()
+        if self.annotate:
+            self._draw_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"draw-{self.processor_id}")
         self._z_root_filter = MedianFilter(window_size=5)
         self._root_positions = []
         logger.info(f"RTMpose 3D processor {self.processor_id} initialized")
         return True
 
+    def _configure_onnx_sessions(self):
+        """Attach ONNX sessions built with our provider options and session settings.
+
+        rtmlib would build its InferenceSessions with bare provider names, so
+        the tracker's tools are constructed without one (_PooledWholebody3d)
+        and get theirs here: the FP16/INT8 variant when present, with the CUDA
+        provider options (cudnn_conv_algo_search etc.), pinned to a single
+        non-spinning thread since streams already run concurrently. Identical
+        sessions are shared across processors via _SESSION_POOL, so only the
+        first stream pays the model load.
+        """
+        import onnxruntime as ort
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        sess_options.intra_op_num_threads = 1
+        sess_options.inter_op_num_threads = 1
+        sess_options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+        for model in (getattr(self.pose_tracker, 'det_model', None),
+                      getattr(self.pose_tracker, 'pose_model', None)):
+            onnx_model = getattr(model, 'onnx_model', None)
+            if onnx_model is None or not hasattr(model, 'session'):
+                continue
+            onnx_model = app_config.quantized_model_variant(onnx_model, self.device)
+            model.session = _shared_session(onnx_model, sess_options, self.onnx_providers)
+            if 'CUDAExecutionProvider' in model.session.get_providers():
+                model.session = _IOBindingSession(model.session)
+            logger.info(f"RTMPose session {type(model).__name__} providers: "
+                        f"{model.session.get_providers()}")
+
     def process_frame(self, frame: np.ndarray, timestamp_ms: int) -> Dict[str, Any]:
         if not self._is_initialized:
             raise RuntimeError("Processor not initialized")
 
-        if frame is None or np.isnan(frame).any():
+        if frame is None or has_nan(frame):
             return None
 
-        frame = np.ascontiguousarray(frame)
+        # draw_skeleton annotates in place, so views and zero-copy (read-only) raw
+        # frames are copied into a reused buffer; the output is resized off it anyway
+        if not (frame.flags.c_contiguous and frame.flags.writeable):
+            contig = self._reuse('_contig_buf', frame.shape, frame.dtype)
+            np.copyto(contig, frame)
+            frame = contig
         keypoints_3d, scores, keypoints_simcc, keypoints_2d = self.pose_tracker(frame)
 
         # Fix z-depth: rtmlib decodes z using image height (384/2=192) instead of
         # the codec z input size (288/2=144). Re-decode z from raw simcc values.
         # x,y are kept from keypoints_2d (stable image-space pixels) in _build_world_landmarks.
         if keypoints_3d is not None and len(keypoints_3d) > 0:
-            keypoints_3d[..., 2] = (keypoints_simcc[..., 2] / _Z_INPUT_HALF - 1.0) * _Z_RANGE
-
-        annotated_frame = draw_skeleton(frame, keypoints_2d, scores, kpt_thr=0.5)
-        annotated_frame = cv2.resize(annotated_frame, (640, 480))
+            # (z / half - 1) * range, folded and written in place into the z view
+            z = keypoints_3d[..., 2]
+            np.multiply(keypoints_simcc[..., 2], _Z_COEF, out=z)
+            z -= _Z_RANGE
+
+        # cv2 drawing releases the GIL, so it overlaps the landmark/FK post-processing
+        draw_future = None
+        if self._draw_pool is not None:
+            draw_future = self._draw_pool.submit(_draw_annotated, frame, keypoints_2d, scores)
+        else:
+            annotated_frame = cv2.resize(frame, (640, 480))
 
         if keypoints_3d is None or len(keypoints_3d) == 0:
+            if draw_future is not None:
+                annotated_frame = draw_future.result()
             return {
                 "processed_frame": annotated_frame,
                 "data": {
@@ -121,6 +342,8 @@ class RTMPoseProcessor(BaseProcessor):
                 "z": float(-rp["z"])
             }
 
+        if draw_future is not None:
+            annotated_frame = draw_future.result()
         return {
             "processed_frame": annotated_frame,
             "data": {
@@ -137,26 +360,13 @@ class RTMPoseProcessor(BaseProcessor):
     def _build_2d_landmarks(self, keypoints_2d: np.ndarray, scores: np.ndarray,
                              w: int, h: int) -> List[Dict]:
         """Build normalized 2D screen-space landmarks from COCO-133 keypoints."""
-        result = []
-        for person_kpts, person_scores in zip(keypoints_2d, scores):
-            landmark_dict = {}
-            for joint_name, indices in COCO133_TO_OUTPUT_JOINTS.items():
-                valid = [i for i in indices if i < len(person_kpts)]
-                if not valid:
-                    landmark_dict[joint_name] = {
-                        "x": 0.0, "y": 0.0, "z": 0.0,
-                        "visibility": 0.0, "presence": 0.0
-                    }
-                    continue
-                landmark_dict[joint_name] = {
-                    "x": float(np.mean([person_kpts[i][0] / w for i in valid])),
-                    "y": float(np.mean([person_kpts[i][1] / h for i in valid])),
-                    "z": 0.0,
-                    "visibility": float(np.mean([person_scores[i] for i in valid])),
-                    "presence": float(np.mean([person_scores[i] for i in valid])),
-                }
-            result.append(landmark_dict)
-        return result
+        kpts = np.asarray(keypoints_2d, dtype=np.float64)
+        person_scores = np.asarray(scores, dtype=np.float64)
+        feats = np.zeros((*kpts.shape[:2], len(_LANDMARK_FIELDS)))
+        feats[..., 0] = kpts[..., 0] / w
+        feats[..., 1] = kpts[..., 1] / h
+        feats[..., 3] = feats[..., 4] = person_scores
+        return [_joints_to_dicts(joints) for joints in _aggregate_joints(feats)]
 
     def _build_world_landmarks(self, keypoints_3d: np.ndarray,
                                 keypoints_2d: np.ndarray,
@@ -171,91 +381,66 @@ class RTMPoseProcessor(BaseProcessor):
         Root position computed separately for scene placement.
         """
         f_est = float(max(w, h))
-        self._root_positions = []
-
-        result = []
-        for person_3d, person_2d, person_scores in zip(
-                keypoints_3d, keypoints_2d, scores):
-            hip_indices = [11, 12]
-
-            # Estimate z_root from visible body extent (smoothed)
-            visible_ys = [person_2d[i][1] for i in range(5, 17)
-                          if i < len(person_2d) and person_scores[i] > 0.3]
-            if len(visible_ys) >= 2:
-                body_height_px = max(visible_ys) - min(visible_ys)
-                z_root = _TORSO_LEG_HEIGHT * f_est / max(body_height_px, 50.0)
+        kpts_2d = np.asarray(keypoints_2d, dtype=np.float64)
+        kpts_3d = np.asarray(keypoints_3d, dtype=np.float64)
+        person_scores = np.asarray(scores, dtype=np.float64)
+        num_kpts = kpts_2d.shape[1]
+        height_scale = _TORSO_LEG_HEIGHT * f_est
+
+        # Estimate z_root per person from visible body extent; the median
+        # filter is stateful, so persons are fed through it in order
+        z_roots = np.empty(len(kpts_2d))
+        for p, (person_2d, person_sc) in enumerate(zip(kpts_2d, person_scores)):
+            body_ys = person_2d[5:17, 1][person_sc[5:17] > 0.3]
+            if len(body_ys) >= 2:
+                body_height_px = body_ys.max() - body_ys.min()
+                z_root = height_scale / max(body_height_px, 50.0)
             else:
                 z_root = 3.0
-            z_root = float(self._z_root_filter.filter(np.array([z_root]))[0])
-
-            # Hip center in image space
-            valid_hips = [i for i in hip_indices if i < len(person_2d)]
-            cx = float(np.mean([person_2d[i][0] for i in valid_hips]))
-            cy = float(np.mean([person_2d[i][1] for i in valid_hips]))
-
-            # Root position for scene placement
-            self._root_positions.append({
-                "x": (cx - w / 2) * z_root / f_est,
-                "y": (cy - h / 2) * z_root / f_est,
-                "z": z_root
-            })
-
-            # Hip center z from corrected simcc (for root-relative depth)
-            hip_3d_z = float(np.mean([person_3d[i][2] for i in hip_indices]))
-
-            # Build landmarks: x,y from 2D pixels (shared z_root), z from simcc
-            landmark_dict = {}
-            for joint_name, indices in COCO133_TO_OUTPUT_JOINTS.items():
-                valid = [i for i in indices if i < len(person_2d)]
-                if not valid:
-                    landmark_dict[joint_name] = {
-                        "x": 0.0, "y": 0.0, "z": 0.0,
-                        "visibility": 0.0, "presence": 0.0
-                    }
-                    continue
-
-                # x,y: perspective unprojection with shared z_root (stable proportions)
-                # z: root-relative depth from corrected simcc
-                landmark_dict[joint_name] = {
-                    "x": float(np.mean([(person_2d[i][0] - cx) * z_root / f_est for i in valid])),
-                    "y": float(np.mean([(person_2d[i][1] - cy) * z_root / f_est for i in valid])),
-                    "z": float(np.mean([person_3d[i][2] - hip_3d_z for i in valid])),
-                    "visibility": float(np.mean([person_scores[i] for i in valid])),
-                    "presence": float(np.mean([person_scores[i] for i in valid])),
-                }
-
-            result.append(landmark_dict)
-        return result
+            z_roots[p] = self._z_root_filter.filter(np.array([z_root]))[0]
+
+        # Hip center in image space and its corrected simcc z (root-relative depth)
+        valid_hips = [i for i in _HIP_INDICES if i < num_kpts]
+        centres = kpts_2d[:, valid_hips, :2].mean(axis=1)
+        hip_z = kpts_3d[:, _HIP_INDICES, 2].mean(axis=1)
+        scale = z_roots / f_est
+
+        # Root position for scene placement
+        root_xy = (centres - (w / 2, h / 2)) * scale[:, None]
+        self._root_positions = [{"x": x, "y": y, "z": z}
+                                for (x, y), z in zip(root_xy.tolist(), z_roots.tolist())]
+
+        # x,y: perspective unprojection with shared z_root (stable proportions)
+        # z: root-relative depth from corrected simcc
+        feats = np.empty((*kpts_2d.shape[:2], len(_LANDMARK_FIELDS)))
+        feats[..., :2] = (kpts_2d[..., :2] - centres[:, None]) * scale[:, None, None]
+        feats[..., 2] = kpts_3d[:, :num_kpts, 2] - hip_z[:, None]
+        feats[..., 3] = feats[..., 4] = person_scores
+        return [_joints_to_dicts(joints) for joints in _aggregate_joints(feats)]
 
     def _fk_processing(self, world_landmarks: List[Dict]) -> Dict:
         """Compute forward kinematics bone rotations from world landmarks."""
         if not world_landmarks:
             return {}
 
-        transformed = {}
-        for joint_name, joint_data in world_landmarks[0].items():
-            if isinstance(joint_data, dict) and all(k in joint_data for k in ["x", "y", "z"]):
-                transformed[joint_name] = {
-                    "x": float(joint_data["x"]),
-                    "y": float(-joint_data["y"]),
-                    "z": float(-joint_data["z"]),
-                    "visibility": float(joint_data.get("visibility", 0.0)),
-                    "presence": float(joint_data.get("presence", 0.0)),
-                }
-            else:
-                transformed[joint_name] = joint_data
+        # _build_world_landmarks emits a fixed {x, y, z, visibility, presence} float
+        # schema, so the MediaPipe -> Three.js flip needs no per-joint validation
+        primary = world_landmarks[0]
+        transformed = {name: {**joint, "y": -joint["y"], "z": -joint["z"]}
+                       for name, joint in primary.items()}
 
-        converter = Converter()
-        fk_data = converter.coordinate2angle(transformed)
+        fk_data = self._converter.coordinate2angle(transformed)
         for joint_name, quat_data in fk_data.items():
             if isinstance(quat_data, dict):
-                original_joint = world_landmarks[0].get(joint_name, {})
-                visibility = original_joint.get("visibility", 0.0) if isinstance(original_joint, dict) else 0.0
-                quat_data["visibility"] = float(visibility)
+                joint = primary.get(joint_name)
+                quat_data["visibility"] = joint["visibility"] if joint else 0.0
 
         return fk_data
 
     def cleanup(self):
+        if self._draw_pool is not None:
+            self._draw_pool.shutdown(wait=True)
+            self._draw_pool = None
         self._is_initialized = False
         logger.info(f"RTMpose processor {self.processor_id} cleaned up")
 
@@ -8,12 +8,12 @@ import cv2
 import numpy as np
 from typing import Optional, Dict, Any
 
-from processors.base_processor import BaseProcessor
+from processors.base_processor import BaseProcessor, has_nan
 from processors.yolo_tcpformer_processor import (
     COCO_KEYPOINT_NAMES,
-    COCO_SKELETON,
     COCO17_TO_OUTPUT_JOINTS,
     _YOLO_MODEL_MAP,
+    draw_coco_skeleton,
 )
 import logging
 
@@ -58,7 +58,7 @@ class YoloPose2DProcessor(BaseProcessor):
                       timestamp_ms: int) -> Dict[str, Any]:
         if not self._is_initialized:
             raise RuntimeError("Processor not initialized")
-        if frame is None or np.isnan(frame).any():
+        if frame is None or has_nan(frame):
             return None
 
         frame = np.ascontiguousarray(frame)
@@ -103,22 +103,8 @@ class YoloPose2DProcessor(BaseProcessor):
 
     def _draw_skeleton(self, frame, kpts_2d, kpt_scores, bboxes):
         """Draw COCO skeleton overlay on the frame."""
-        for pidx in range(len(kpts_2d)):
-            kpts = kpts_2d[pidx]
-            scores = kpt_scores[pidx]
-            if pidx < len(bboxes):
-                x1, y1, x2, y2 = bboxes[pidx].astype(int)
-                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            for i, (pt, s) in enumerate(zip(kpts, scores)):
-                if s > self.confidence_threshold:
-                    cv2.circle(frame, (int(pt[0]), int(pt[1])), 5,
-                               (0, 255, 0), -1)
-            for si, ei in COCO_SKELETON:
-                if (scores[si] > self.confidence_threshold and
-                        scores[ei] > self.confidence_threshold):
-                    p1 = (int(kpts[si][0]), int(kpts[si][1]))
-                    p2 = (int(kpts[ei][0]), int(kpts[ei][1]))
-                    cv2.line(frame, p1, p2, (255, 0, 0), 2)
+        draw_coco_skeleton(frame, kpts_2d, kpt_scores, bboxes,
+                           self.confidence_threshold)
 
     @staticmethod
     def _build_2d_landmarks(kpts_2d, kpt_scores, w, h):
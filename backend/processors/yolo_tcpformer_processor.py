@@ -13,13 +13,15 @@ Pipeline per frame:
 
 import cv2
 import numpy as np
+import threading
 from collections import deque
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
 import torch
 
-from processors.base_processor import BaseProcessor
+from processors.base_processor import BaseProcessor, has_nan
+from utils.batching import MicroBatcher
 from utils.kinetic import Converter
 import config as app_config
 import logging
@@ -50,6 +52,28 @@ COCO_SKELETON = [
     (5, 11), (6, 12), (11, 12),
     (11, 13), (13, 15), (12, 14), (14, 16),
 ]
+_COCO_EDGES = np.array(COCO_SKELETON, dtype=np.intp)
+
+
+def draw_coco_skeleton(frame: np.ndarray, kpts_2d: np.ndarray,
+                       kpt_scores: np.ndarray, bboxes: np.ndarray,
+                       threshold: float) -> None:
+    """Draw person boxes, confident COCO-17 keypoints and the edges between them, in place.
+
+    Pixel coordinates and visibility are computed for all people at once, and
+    each person's edges are drawn as two-point open polylines in one call.
+    """
+    pts = np.asarray(kpts_2d)[..., :2].astype(np.int32)   # [N, 17, 2]
+    visible = np.asarray(kpt_scores) > threshold          # [N, 17]
+    for pidx in range(len(pts)):
+        if pidx < len(bboxes):
+            x1, y1, x2, y2 = bboxes[pidx].astype(int)
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        for x, y in pts[pidx][visible[pidx]].tolist():
+            cv2.circle(frame, (x, y), 5, (0, 255, 0), -1)
+        edges = _COCO_EDGES[visible[pidx][_COCO_EDGES].all(axis=1)]
+        if len(edges):
+            cv2.polylines(frame, pts[pidx][edges], False, (255, 0, 0), 2)
 
 # COCO-17 → H36M-17 mapping.  Each entry is (h36m_idx, [list of coco indices to average]).
 _COCO_TO_H36M = [
@@ -131,6 +155,8 @@ _YOLO_MODEL_MAP = {
 # Google Drive file ID for TCPFormer H36M-81 checkpoint
 _GDRIVE_FILE_ID = '14D_gfCflgl67-nl0L2MJijbARizbphnP'
 _CHECKPOINT_NAME = 'TCPFormer_h36m_81.pth.tr'
+# ONNX export written by scripts/export_tcpformer_onnx.py (+ ``_int8`` variant)
+ONNX_NAME = 'tcpformer_h36m_81.onnx'
 
 
 def _download_checkpoint(dest: Path) -> None:
@@ -153,6 +179,128 @@ def _download_checkpoint(dest: Path) -> None:
         ) from e
 
 
+# One TCPFormer model + micro-batcher per device, shared by all streams
+_LIFTERS: Dict[str, MicroBatcher] = {}
+_LIFTER_MODELS: Dict[str, Any] = {}  # torch module or ORT InferenceSession
+_LIFTERS_LOCK = threading.Lock()
+
+
+def build_tcpformer() -> torch.nn.Module:
+    """Build TCPFormer with the H36M-81 checkpoint as an FP32 CPU model in eval mode."""
+    from models.tcpformer.model import MemoryInducedTransformer, load_checkpoint
+
+    ckpt_path = app_config.MODELS_DIR / 'tcpformer' / _CHECKPOINT_NAME
+    _download_checkpoint(ckpt_path)
+
+    logger.info(f"Loading TCPFormer (n_frames={_N_FRAMES})")
+    model = MemoryInducedTransformer(
+        n_layers=16, dim_in=3, dim_feat=128, dim_rep=512, dim_out=3,
+        mlp_ratio=4, num_heads=8, num_joints=17, n_frames=_N_FRAMES,
+        use_layer_scale=True, layer_scale_init_value=1e-5,
+        use_adaptive_fusion=True, qkv_bias=False,
+    )
+
+    state = torch.load(str(ckpt_path), map_location='cpu', weights_only=False)
+    # Checkpoint may wrap state_dict under various keys
+    if isinstance(state, dict):
+        for key in ('model_pos', 'state_dict', 'model'):
+            if key in state:
+                state = state[key]
+                break
+    # Strip DataParallel 'module.' prefix from checkpoint keys
+    if any(k.startswith('module.') for k in state.keys()):
+        state = {k.removeprefix('module.'): v for k, v in state.items()}
+    load_checkpoint(model, state)
+    return model.eval()
+
+
+def _load_tcpformer(device: str) -> torch.nn.Module:
+    """Load TCPFormer onto ``device`` with the device-specific inference optimizations."""
+    from models.tcpformer.model import quantize_for_cpu
+
+    model = build_tcpformer()
+    if device == 'cuda':
+        model = model.cuda()
+    if device == 'cpu' and app_config.TCPFORMER_CPU_INT8:
+        model = quantize_for_cpu(model)
+        logger.info("TCPFormer Linear layers quantized to INT8 (dynamic)")
+    if device == 'cuda' and app_config.TCPFORMER_COMPILE:
+        # Fuses the LayerNorm/GELU/residual chains and replays the 16-layer
+        # stack as a CUDA graph; shapes are fixed apart from the batch size
+        model = torch.compile(model, mode="reduce-overhead", dynamic=False)
+        logger.info("TCPFormer compiled with torch.compile (reduce-overhead)")
+    logger.info("TCPFormer model loaded successfully")
+    return model
+
+
+def _load_onnx_lifter():
+    """Open the exported TCPFormer graph with ONNX Runtime, or None if it was not exported."""
+    onnx_dir = app_config.MODELS_DIR / 'tcpformer'
+    path = onnx_dir / ONNX_NAME
+    int8_path = path.with_name(f"{path.stem}_int8.onnx")
+    if app_config.TCPFORMER_CPU_INT8 and int8_path.exists():
+        path = int8_path
+    if not path.exists():
+        return None
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        return None
+    sess_options = ort.SessionOptions()
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    sess_options.intra_op_num_threads = 1
+    sess_options.inter_op_num_threads = 1
+    sess_options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+    session = ort.InferenceSession(str(path), sess_options=sess_options,
+                                   providers=["CPUExecutionProvider"])
+    logger.info(f"TCPFormer running on ONNX Runtime: {path.name}")
+    return session
+
+
+def _acquire_lifter(device: str) -> MicroBatcher:
+    """Return the shared TCPFormer batcher for ``device``, loading the model on first use.
+
+    Streams submit one (81, 17, 3) window each; concurrent windows are stacked
+    into a single forward pass and each stream gets back its last-frame (17, 3).
+    """
+    with _LIFTERS_LOCK:
+        batcher = _LIFTERS.get(device)
+        if batcher is None:
+            # On CPU an exported ONNX graph, when present, replaces the torch model
+            model = _load_onnx_lifter() if device == 'cpu' else None
+            if model is not None:
+                input_name = model.get_inputs()[0].name
+
+                def run_batch(batch: np.ndarray) -> np.ndarray:
+                    out = model.run(None, {input_name: batch.astype(np.float32, copy=False)})[0]
+                    return out[:, -1]  # (B,17,3)
+            else:
+                model = _load_tcpformer(device)
+
+                def run_batch(batch: np.ndarray) -> np.ndarray:
+                    with torch.no_grad():
+                        inp = torch.from_numpy(batch).float()  # (B,81,17,3)
+                        if device == 'cuda':
+                            inp = inp.cuda()
+                        return model(inp)[:, -1].cpu().numpy()  # (B,17,3)
+
+            batcher = MicroBatcher(run_batch, name=f"tcpformer-{device}")
+            _LIFTERS[device] = batcher
+            _LIFTER_MODELS[device] = model
+        batcher.add_client()
+        return batcher
+
+
+def _release_lifter(device: str) -> None:
+    """Drop a stream's reference; the model is freed when no streams use it."""
+    with _LIFTERS_LOCK:
+        batcher = _LIFTERS.get(device)
+        if batcher is not None and batcher.remove_client() == 0:
+            batcher.close()
+            del _LIFTERS[device]
+            del _LIFTER_MODELS[device]
+
+
 def _coco17_to_h36m17(kpts_coco: np.ndarray, scores_coco: np.ndarray):
     """Convert COCO-17 keypoints to H36M-17 ordering.
 
@@ -192,8 +340,10 @@ class YoloTCPFormerProcessor(BaseProcessor):
         self.model_size = pose_cfg.get('model_size', 'm')
         self.yolo_model = None
         self.tcp_model = None
+        self._lifter: Optional[MicroBatcher] = None
         # Per-person frame buffer: person_idx → deque of (h36m_kpts_norm, scores)
         self._frame_buffer: deque = deque(maxlen=_N_FRAMES)
+        self._converter = Converter()
 
     # ------------------------------------------------------------------
     # Lifecycle
@@ -221,37 +371,13 @@ class YoloTCPFormerProcessor(BaseProcessor):
             self.yolo_model.to('cuda')
 
     def _init_tcpformer(self):
-        from models.tcpformer.model import MemoryInducedTransformer
-
-        ckpt_path = app_config.MODELS_DIR / 'tcpformer' / _CHECKPOINT_NAME
-        _download_checkpoint(ckpt_path)
-
-        logger.info(f"Loading TCPFormer (n_frames={_N_FRAMES}) on {self.device}")
-        self.tcp_model = MemoryInducedTransformer(
-            n_layers=16, dim_in=3, dim_feat=128, dim_rep=512, dim_out=3,
-            mlp_ratio=4, num_heads=8, num_joints=17, n_frames=_N_FRAMES,
-            use_layer_scale=True, layer_scale_init_value=1e-5,
-            use_adaptive_fusion=True, qkv_bias=False,
-        )
-
-        state = torch.load(str(ckpt_path), map_location='cpu', weights_only=False)
-        # Checkpoint may wrap state_dict under various keys
-        if isinstance(state, dict):
-            for key in ('model_pos', 'state_dict', 'model'):
-                if key in state:
-                    state = state[key]
-                    break
-        # Strip DataParallel 'module.' prefix from checkpoint keys
-        if any(k.startswith('module.') for k in state.keys()):
-            state = {k.removeprefix('module.'): v for k, v in state.items()}
-        self.tcp_model.load_state_dict(state, strict=False)
-
-        if self.device == 'cuda':
-            self.tcp_model = self.tcp_model.cuda()
-        self.tcp_model.eval()
-        logger.info("TCPFormer model loaded successfully")
+        self._lifter = _acquire_lifter(self.device)
+        self.tcp_model = _LIFTER_MODELS[self.device]
 
     def cleanup(self):
+        if self._lifter is not None:
+            _release_lifter(self.device)
+            self._lifter = None
         self.yolo_model = None
         self.tcp_model = None
         self._frame_buffer.clear()
@@ -269,7 +395,7 @@ class YoloTCPFormerProcessor(BaseProcessor):
                       timestamp_ms: int) -> Dict[str, Any]:
         if not self._is_initialized:
             raise RuntimeError("Processor not initialized")
-        if frame is None or np.isnan(frame).any():
+        if frame is None or has_nan(frame):
             return None
 
         frame = np.ascontiguousarray(frame)
@@ -318,13 +444,8 @@ class YoloTCPFormerProcessor(BaseProcessor):
             buf.insert(0, buf[0])
         input_seq = np.stack(buf, axis=0)  # (81, 17, 3)
 
-        # --- TCPFormer 3D inference ---
-        with torch.no_grad():
-            inp = torch.from_numpy(input_seq).unsqueeze(0).float()  # (1,81,17,3)
-            if self.device == 'cuda':
-                inp = inp.cuda()
-            out_3d = self.tcp_model(inp)  # (1, 81, 17, 3)
-            pred_3d = out_3d[0, -1].cpu().numpy()  # last frame → (17, 3)
+        # --- TCPFormer 3D inference (batched with other streams) ---
+        pred_3d = self._lifter.submit(input_seq)  # last frame → (17, 3)
 
         # TCPFormer output is root-relative in a metric scale (~meters)
         pred_3d_m = pred_3d
@@ -474,8 +595,7 @@ class YoloTCPFormerProcessor(BaseProcessor):
                 }
             else:
                 transformed[jn] = jd
-        converter = Converter()
-        fk = converter.coordinate2angle(transformed)
+        fk = self._converter.coordinate2angle(transformed)
         for jn, qd in fk.items():
             if isinstance(qd, dict):
                 orig = world_landmarks[0].get(jn, {})
@@ -485,19 +605,5 @@ class YoloTCPFormerProcessor(BaseProcessor):
 
     def _draw_skeleton(self, frame, kpts_2d, kpt_scores, bboxes):
         """Draw COCO skeleton overlay on the frame."""
-        for pidx in range(len(kpts_2d)):
-            kpts = kpts_2d[pidx]
-            scores = kpt_scores[pidx]
-            if pidx < len(bboxes):
-                x1, y1, x2, y2 = bboxes[pidx].astype(int)
-                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            for i, (pt, s) in enumerate(zip(kpts, scores)):
-                if s > self.confidence_threshold:
-                    cv2.circle(frame, (int(pt[0]), int(pt[1])), 5,
-                               (0, 255, 0), -1)
-            for si, ei in COCO_SKELETON:
-                if (scores[si] > self.confidence_threshold and
-                        scores[ei] > self.confidence_threshold):
-                    p1 = (int(kpts[si][0]), int(kpts[si][1]))
-                    p2 = (int(kpts[ei][0]), int(kpts[ei][1]))
-                    cv2.line(frame, p1, p2, (255, 0, 0), 2)
+        draw_coco_skeleton(frame, kpts_2d, kpt_scores, bboxes,
+                           self.confidence_threshold)
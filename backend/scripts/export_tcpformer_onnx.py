@@ -0,0 +1,79 @@
+"""Export the TCPFormer lifter to ONNX for CPU inference with ONNX Runtime.
+
+Writes ``tcpformer_h36m_81.onnx`` (transformer-optimized FP32) and
+``tcpformer_h36m_81_int8.onnx`` (dynamic INT8) into ``MODELS_DIR/tcpformer``.
+YoloTCPFormerProcessor serves CPU streams from these instead of PyTorch when
+present (the INT8 one only with TCPFORMER_CPU_INT8=1).
+
+Usage (from backend/):
+    python scripts/export_tcpformer_onnx.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import torch
+
+import config
+from models.tcpformer.model import _FP32_LINEARS
+from processors.yolo_tcpformer_processor import (
+    ONNX_NAME, _N_FRAMES, _N_JOINTS_H36M, build_tcpformer,
+)
+
+
+def export(dst, model=None, n_frames=_N_FRAMES):
+    model = model if model is not None else build_tcpformer()
+    sample = torch.zeros(1, n_frames, _N_JOINTS_H36M, 3)
+    # TorchScript exporter: the dynamo one (default on newer torch) needs onnxscript
+    torch.onnx.export(model, (sample,), str(dst), opset_version=17,
+                      input_names=["input"], output_names=["output"],
+                      dynamic_axes={"input": {0: "batch"}, "output": {0: "batch"}},
+                      dynamo=False)
+
+
+def optimize(path):
+    # The BERT fusion passes match the generic LN / attention / GELU patterns
+    from onnxruntime.transformers import optimizer
+    optimizer.optimize_model(str(path), model_type="bert", num_heads=8,
+                             hidden_size=128).save_model_to_file(str(path))
+
+
+def fp32_nodes(path):
+    """MatMul/Gemm nodes of the layers quantize_for_cpu keeps in FP32 (joints_embed, head)."""
+    import onnx
+    prefixes = tuple(f"/{name}/" for name in _FP32_LINEARS)
+    return [node.name for node in onnx.load(str(path)).graph.node
+            if node.op_type in ("MatMul", "Gemm") and node.name.startswith(prefixes)]
+
+
+def quantize_int8(src, dst):
+    import onnx
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    keep = fp32_nodes(src)
+    if len(keep) != len(_FP32_LINEARS):
+        raise RuntimeError(f"expected one MatMul/Gemm per FP32 layer {sorted(_FP32_LINEARS)}, found {keep}")
+    # Fused contrib ops from optimize() defeat shape inference; their outputs are FP32
+    quantize_dynamic(model_input=str(src), model_output=str(dst),
+                     weight_type=QuantType.QInt8, nodes_to_exclude=keep,
+                     extra_options={"DefaultTensorType": onnx.TensorProto.FLOAT})
+
+
+def main():
+    out_dir = config.MODELS_DIR / "tcpformer"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    dst = out_dir / ONNX_NAME
+    print(f"TCPFormer -> {dst}")
+    export(dst)
+    try:
+        optimize(dst)
+    except ImportError as e:
+        print(f"  transformer optimization skipped ({e})")
+    int8 = dst.with_name(f"{dst.stem}_int8.onnx")
+    print(f"{dst.name} -> {int8}")
+    quantize_int8(dst, int8)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Produce reduced-precision variants of the RTMPose ONNX models.
+
+Writes ``<stem>_int8.onnx`` (dynamic INT8, for CPU) and ``<stem>_fp16.onnx``
+(FP16 weights with FP32 I/O, for CUDA) into ``MODELS_DIR/rtmpose``.
+RTMPoseProcessor uses them for the matching device when RTMPOSE_QUANTIZED=1.
+
+Usage (from backend/):
+    python scripts/quantize_rtmpose.py [model.onnx ...]
+
+With no arguments, the models used by the default Wholebody3d pipeline are
+downloaded through rtmlib and converted. FP16 conversion needs the
+``onnxconverter-common`` package.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import config
+
+
+def _default_models():
+    from rtmlib import Wholebody3d
+    solution = Wholebody3d(mode='balanced', backend='onnxruntime', device='cpu')
+    return [solution.det_model.onnx_model, solution.pose_model.onnx_model]
+
+
+def quantize_int8(src: Path, dst: Path):
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    quantize_dynamic(model_input=str(src), model_output=str(dst),
+                     weight_type=QuantType.QInt8)
+
+
+def convert_fp16(src: Path, dst: Path):
+    import onnx
+    from onnxconverter_common import float16
+    model = float16.convert_float_to_float16(onnx.load(str(src)), keep_io_types=True)
+    onnx.save(model, str(dst))
+
+
+def main(paths):
+    out_dir = config.MODELS_DIR / "rtmpose"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for src in map(Path, paths or _default_models()):
+        for precision, convert in (("int8", quantize_int8), ("fp16", convert_fp16)):
+            dst = out_dir / f"{src.stem}_{precision}.onnx"
+            print(f"{src.name} -> {dst}")
+            try:
+                convert(src, dst)
+            except ImportError as e:
+                print(f"  skipped ({e})")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
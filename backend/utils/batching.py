@@ -0,0 +1,81 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Batch single-sample model calls coming from several worker threads.
+
+    Each stream's worker calls submit() with one sample and blocks for its
+    result. A collector thread gathers the samples that arrive within
+    max_wait_s (at most one per registered client), stacks them along a new
+    batch axis, runs batch_fn once and hands each caller its slice.
+    """
+
+    def __init__(self, batch_fn: Callable[[np.ndarray], np.ndarray],
+                 max_wait_s: float = 0.005, name: str = "micro-batcher"):
+        self._batch_fn = batch_fn
+        self.max_wait_s = max_wait_s
+        self._queue: queue.Queue = queue.Queue()
+        self._clients = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def clients(self) -> int:
+        return self._clients
+
+    def add_client(self):
+        with self._lock:
+            self._clients += 1
+
+    def remove_client(self) -> int:
+        """Unregister a client and return how many remain."""
+        with self._lock:
+            self._clients = max(0, self._clients - 1)
+            return self._clients
+
+    def submit(self, sample: np.ndarray) -> np.ndarray:
+        future = Future()
+        self._queue.put((sample, future))
+        return future.result()
+
+    def close(self):
+        self._queue.put(None)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            items = [item]
+            # Only wait for company when other streams could contribute a sample
+            deadline = time.monotonic() + self.max_wait_s
+            while len(items) < self._clients:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                items.append(item)
+
+            samples, futures = zip(*items)
+            try:
+                outputs = self._batch_fn(np.stack(samples, axis=0))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            for future, output in zip(futures, outputs):
+                future.set_result(output)
@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+import logging
+from contextlib import contextmanager
+from urllib.request import urlopen
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the atomic rename alone
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _file_lock(lock_path: str):
+    """Exclusive advisory lock on ``lock_path`` (no-op where fcntl is unavailable)."""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path, 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def download_file(url: str, dst: str, chunk_size: int = 1 << 20) -> str:
+    """Stream ``url`` to ``dst`` through a temp file in the same directory.
+
+    A sidecar ``.lock`` file serializes processors (or worker processes)
+    fetching the same model, so only the first downloads and the rest reuse
+    its file. The final ``os.replace`` is atomic, so a concurrent reader
+    never sees a partially written file.
+    """
+    dst_dir = os.path.dirname(os.path.abspath(dst))
+    os.makedirs(dst_dir, exist_ok=True)
+    with _file_lock(f"{dst}.lock"):
+        if os.path.exists(dst):
+            return dst
+        logger.info(f"Downloading {url} -> {dst}")
+        fd, tmp_path = tempfile.mkstemp(dir=dst_dir, suffix='.part')
+        try:
+            with urlopen(url) as response, os.fdopen(fd, 'wb') as out:
+                shutil.copyfileobj(response, out, chunk_size)
+            os.replace(tmp_path, dst)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return dst
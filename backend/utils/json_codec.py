@@ -0,0 +1,18 @@
+"""orjson-backed stand-in for the ``json`` module, passed to python-socketio.
+
+Socket.IO only needs ``dumps``/``loads``; extra keyword arguments it passes
+(e.g. ``separators``) are ignored since orjson always emits compact output.
+numpy arrays and scalars in pose payloads are serialized natively.
+"""
+
+import orjson
+
+_DUMPS_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(obj, **_kwargs) -> str:
+    return orjson.dumps(obj, option=_DUMPS_OPTIONS).decode()
+
+
+def loads(s, **_kwargs):
+    return orjson.loads(s)
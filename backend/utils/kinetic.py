@@ -56,12 +56,18 @@ class Converter:
         self.kpts['available_joints'] = set()
         self.get_bone_lengths()
         self.get_base_skeleton()
+        # Everything added to kpts after this point is per-frame state
+        self._static_keys = frozenset(self.kpts)
 
     def coordinate2angle(self, coordinates: Dict[str, float]) -> Dict[str, float]:
         """
         Convert 3D coordinates to joint angles (forward kinematics).
         Handles partial joint data - generates angles for joints with complete parent chains.
         """
+        # Drop the previous frame's joints and angles so a reused converter never
+        # reads a joint that is missing from this frame
+        for key in [k for k in self.kpts if k not in self._static_keys]:
+            del self.kpts[key]
         self.kpts['available_joints'] = set()
         
         for joint, coords in coordinates.items():
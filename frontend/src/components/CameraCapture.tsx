@@ -56,13 +56,14 @@ export function CameraCapture({
     ) {
       const ctx = processedCanvasRef.current.getContext('2d');
       if (ctx) {
-        const img = new Image();
-        img.onload = () => {
-          processedCanvasRef.current!.width = img.width;
-          processedCanvasRef.current!.height = img.height;
-          ctx.drawImage(img, 0, 0);
-        };
-        img.src = `data:image/jpeg;base64,${backendResult.frame}`;
+        createImageBitmap(new Blob([backendResult.frame], { type: 'image/jpeg' }))
+          .then((bitmap) => {
+            processedCanvasRef.current!.width = bitmap.width;
+            processedCanvasRef.current!.height = bitmap.height;
+            ctx.drawImage(bitmap, 0, 0);
+            bitmap.close();
+          })
+          .catch((err) => console.error('[Camera] Failed to decode frame:', err));
       }
     }
   }, [backendResult]);
@@ -192,20 +193,18 @@ export function CameraCapture({
           canvasRef.current.toBlob(
             (blob) => {
               if (blob) {
-                const reader = new FileReader();
-                reader.onloadend = () => {
-                  streamServiceRef.current?.sendFrame(
-                    reader.result as string,
-                    Date.now(),
-                  );
+                blob.arrayBuffer().then((buffer) => {
+                  streamServiceRef.current?.sendFrame(buffer, Date.now());
                   isProcessingFrameRef.current = false;
                   waitingForResultRef.current = true;
                   waitingTimeoutRef.current = setTimeout(() => {
                     waitingForResultRef.current = false;
                     waitingTimeoutRef.current = null;
                   }, 2000);
-                };
-                reader.readAsDataURL(blob);
+                }).catch((err) => {
+                  console.error('[Camera] Failed to read frame:', err);
+                  isProcessingFrameRef.current = false;
+                });
               } else {
                 isProcessingFrameRef.current = false;
               }
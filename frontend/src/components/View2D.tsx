@@ -17,13 +17,15 @@ export function View2D({ socket }: View2DProps) {
     const ctx = displayCanvasRef.current.getContext('2d');
     if (!ctx) return;
 
-    const img = new Image();
-    img.onload = () => {
-      displayCanvasRef.current!.width = img.width;
-      displayCanvasRef.current!.height = img.height;
-      ctx.drawImage(img, 0, 0);
-    };
-    img.src = `data:image/jpeg;base64,${backendResult.frame}`;
+    createImageBitmap(new Blob([backendResult.frame], { type: 'image/jpeg' }))
+      .then((bitmap) => {
+        if (!displayCanvasRef.current) return;
+        displayCanvasRef.current.width = bitmap.width;
+        displayCanvasRef.current.height = bitmap.height;
+        ctx.drawImage(bitmap, 0, 0);
+        bitmap.close();
+      })
+      .catch((err) => console.error('[View2D] Failed to decode frame:', err));
   }, [backendResult]);
 
   // Clear canvas to black when stream stops
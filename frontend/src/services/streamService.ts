@@ -8,7 +8,7 @@ export class StreamService {
     private streamId: string
   ) {}
 
-  sendFrame(frameData: string, timestamp: number): void {
+  sendFrame(frameData: ArrayBuffer, timestamp: number): void {
     if (timestamp < this.lastSentTimestamp) return;
     
     this.lastSentTimestamp = timestamp;
@@ -54,7 +54,7 @@ export interface PoseData {
 
 export interface PoseResult {
   stream_id: string;
-  frame: string;
+  frame: ArrayBuffer;
   pose_data: PoseData;
   timestamp_ms: number;
 }
@@ -102,7 +102,8 @@ export type ResultData = PoseData | ObjectDetectionData | HandGestureData;
 // Generic backend result (all processors use the pose_result event)
 export interface BackendResult {
   stream_id: string;
-  frame: string;
+  frame: ArrayBuffer;
   pose_data: ResultData | null;
   timestamp_ms: number;
+  frames_dropped?: number;
 }
@@ -0,0 +1,90 @@
+"""Tests for MediaPipeProcessor's table-driven landmark aggregation (no model download).
+
+_landmark_array packs MediaPipe landmarks into one array and
+_aggregate_landmarks averages them into the output joints through
+precomputed gather tables. These tests check both against a straightforward
+per-joint mean over OUTPUT_LANDMARK_NAMES.
+
+Usage:
+    python tests/test_mediapipe_landmarks.py
+    python -m pytest tests/test_mediapipe_landmarks.py
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+
+import numpy as np
+
+import processors.mediapipe_processor as mediapipe
+
+FIELDS = ("x", "y", "z", "visibility", "presence")
+
+
+def random_poses(num_poses, seed=0):
+    """MediaPipe-like results: one list of landmark objects per pose."""
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(-1.0, 1.0, size=(num_poses, len(mediapipe.MEDIAPIPE_LANDMARK_NAMES),
+                                           len(FIELDS))).astype(np.float32)
+    return [[SimpleNamespace(**dict(zip(FIELDS, lm))) for lm in pose.tolist()]
+            for pose in values]
+
+
+def naive_joints(poses):
+    """Per-joint mean of each pose's named landmarks."""
+    out = []
+    for pose in poses:
+        by_name = dict(zip(mediapipe.MEDIAPIPE_LANDMARK_NAMES, pose))
+        joints = {}
+        for name, sources in mediapipe.OUTPUT_LANDMARK_NAMES.items():
+            joints[name] = {f: float(np.mean([getattr(by_name[src], f) for src in sources]))
+                            for f in FIELDS}
+        out.append(joints)
+    return out
+
+
+def test_landmark_array_packs_every_field():
+    poses = random_poses(2)
+    arr = mediapipe._landmark_array(poses)
+    assert arr.dtype == np.float32
+    assert arr.shape == (2, len(mediapipe.MEDIAPIPE_LANDMARK_NAMES), len(FIELDS))
+    for p, pose in enumerate(poses):
+        for i, lm in enumerate(pose):
+            assert arr[p, i].tolist() == [getattr(lm, f) for f in FIELDS]
+
+
+def test_aggregate_matches_per_joint_mean():
+    poses = random_poses(3, seed=1)
+    joints = mediapipe._aggregate_landmarks(mediapipe._landmark_array(poses))
+    assert joints.shape == (3, len(mediapipe._OUTPUT_NAMES), len(FIELDS))
+
+    expected = naive_joints(poses)
+    for got, want in zip((mediapipe._landmarks_to_dicts(j) for j in joints), expected):
+        assert list(got) == list(want), "joint order changed"
+        for name in want:
+            np.testing.assert_allclose([got[name][f] for f in FIELDS],
+                                       [want[name][f] for f in FIELDS],
+                                       rtol=1e-6, atol=1e-7, err_msg=name)
+
+    # Multi-source joints are true means, not a copy of one source
+    left_hip, right_hip = poses[0][23], poses[0][24]
+    assert not np.isclose(expected[0]["hipCentre"]["x"], left_hip.x)
+    np.testing.assert_allclose(expected[0]["hipCentre"]["x"], (left_hip.x + right_hip.x) / 2)
+
+
+def test_no_poses():
+    arr = mediapipe._landmark_array([])
+    assert arr.shape == (0, len(mediapipe.MEDIAPIPE_LANDMARK_NAMES), len(FIELDS))
+    assert mediapipe._aggregate_landmarks(arr).shape == (0, len(mediapipe._OUTPUT_NAMES), len(FIELDS))
+
+
+if __name__ == "__main__":
+    for test in (test_landmark_array_packs_every_field,
+                 test_aggregate_matches_per_joint_mean,
+                 test_no_poses):
+        print(f"{test.__name__} ...")
+        test()
+        print("  PASS")
+    print("\n=== All MediaPipe landmark tests passed ===")
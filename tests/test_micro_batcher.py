@@ -0,0 +1,159 @@
+"""Tests for the MicroBatcher shared by TCPFormer streams (no models needed).
+
+Usage:
+    python tests/test_micro_batcher.py
+    python -m pytest tests/test_micro_batcher.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+
+import numpy as np
+
+from utils.batching import MicroBatcher
+
+# Long enough that a batcher which waits for company would be obviously slow
+LONG_WAIT_S = 2.0
+
+
+def submit_concurrently(batcher, n):
+    """Submit sample i from n threads at once; return (results, errors) indexed by i."""
+    results, errors = [None] * n, [None] * n
+    barrier = threading.Barrier(n)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = batcher.submit(np.full(3, i, dtype=np.float32))
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+        assert not t.is_alive(), "submit() never returned"
+    return results, errors
+
+
+def test_single_client_never_waits():
+    batcher = MicroBatcher(lambda batch: batch * 2, max_wait_s=LONG_WAIT_S)
+    batcher.add_client()
+    try:
+        for i in range(3):
+            start = time.monotonic()
+            out = batcher.submit(np.full(3, i, dtype=np.float32))
+            assert time.monotonic() - start < LONG_WAIT_S / 4
+            assert np.array_equal(out, np.full(3, 2 * i))
+    finally:
+        batcher.close()
+
+
+def test_concurrent_submitters_get_their_own_row():
+    n = 4
+    batch_sizes = []
+
+    def batch_fn(batch):
+        batch_sizes.append(len(batch))
+        return batch * 10
+
+    batcher = MicroBatcher(batch_fn, max_wait_s=LONG_WAIT_S)
+    for _ in range(n):
+        batcher.add_client()
+    try:
+        results, errors = submit_concurrently(batcher, n)
+    finally:
+        batcher.close()
+
+    assert errors == [None] * n
+    for i, out in enumerate(results):
+        assert np.array_equal(out, np.full(3, 10 * i)), f"stream {i} got {out}"
+    assert sum(batch_sizes) == n
+    assert max(batch_sizes) > 1, f"samples were never batched: {batch_sizes}"
+
+
+def test_batch_exception_reaches_every_waiter():
+    n = 3
+    calls = []
+
+    def batch_fn(batch):
+        calls.append(len(batch))
+        raise ValueError("lifter failed")
+
+    batcher = MicroBatcher(batch_fn, max_wait_s=LONG_WAIT_S)
+    for _ in range(n):
+        batcher.add_client()
+    try:
+        results, errors = submit_concurrently(batcher, n)
+    finally:
+        batcher.close()
+
+    assert sum(calls) == n
+    for i, err in enumerate(errors):
+        assert isinstance(err, ValueError), f"stream {i} got {err!r} / {results[i]!r}"
+
+
+def test_batcher_survives_a_failed_batch():
+    calls = []
+
+    def batch_fn(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise RuntimeError("first batch fails")
+        return batch + 1
+
+    batcher = MicroBatcher(batch_fn, max_wait_s=0.0)
+    batcher.add_client()
+    try:
+        try:
+            batcher.submit(np.zeros(3))
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("first batch did not raise")
+        assert np.array_equal(batcher.submit(np.zeros(3)), np.ones(3))
+    finally:
+        batcher.close()
+
+
+def test_releasing_last_client_stops_the_thread():
+    import processors.yolo_tcpformer_processor as proc
+
+    device = "test-device"
+    batcher = MicroBatcher(lambda batch: batch, name="tcpformer-test")
+    batcher.add_client()
+    batcher.add_client()
+    with proc._LIFTERS_LOCK:
+        proc._LIFTERS[device] = batcher
+        proc._LIFTER_MODELS[device] = object()
+
+    proc._release_lifter(device)
+    assert batcher.clients == 1
+    assert device in proc._LIFTERS
+    assert batcher._thread.is_alive()
+
+    proc._release_lifter(device)
+    batcher._thread.join(timeout=5)
+    assert not batcher._thread.is_alive()
+    assert device not in proc._LIFTERS
+    assert device not in proc._LIFTER_MODELS
+
+    # A stray extra release is a no-op
+    proc._release_lifter(device)
+
+
+if __name__ == "__main__":
+    for test in (test_single_client_never_waits,
+                 test_concurrent_submitters_get_their_own_row,
+                 test_batch_exception_reaches_every_waiter,
+                 test_batcher_survives_a_failed_batch,
+                 test_releasing_last_client_stops_the_thread):
+        print(f"{test.__name__} ...")
+        test()
+        print("  PASS")
+    print("\n=== All MicroBatcher tests passed ===")
@@ -0,0 +1,117 @@
+"""Tests for uncompressed frames sent with process_frame_raw (no models needed).
+
+WebSocketHandler._decode_raw_frame wraps the pixels in an ndarray (BGR without
+a copy, RGB / RGBA converted); a frame whose size or pixel format is wrong
+must decode to None so the client gets the "Invalid frame data" error.
+
+Usage:
+    python tests/test_raw_frames.py
+    python -m pytest tests/test_raw_frames.py
+"""
+
+import asyncio
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+
+import numpy as np
+import socketio
+
+from core.websocket_handler import WebSocketHandler
+
+W, H = 8, 6
+
+
+def random_pixels(channels, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (H, W, channels), dtype=np.uint8)
+
+
+def raw_frame(pixels, pixfmt):
+    return {"width": W, "height": H, "pixfmt": pixfmt, "data": pixels.tobytes()}
+
+
+def make_handler():
+    return WebSocketHandler(socketio.AsyncServer(async_mode="asgi"))
+
+
+def test_bgr_is_a_zero_copy_view():
+    pixels = random_pixels(3)
+    raw = raw_frame(pixels, "bgr")
+    frame = WebSocketHandler._decode_raw_frame(raw)
+    assert np.array_equal(frame, pixels)
+    assert np.shares_memory(frame, np.frombuffer(raw["data"], np.uint8)), "BGR frame was copied"
+    # Socket.IO hands binary attachments over as bytes, so the view is read-only
+    assert not frame.flags.writeable
+
+
+def test_rgb_and_rgba_are_converted_to_bgr():
+    rgb = random_pixels(3, seed=1)
+    frame = WebSocketHandler._decode_raw_frame(raw_frame(rgb, "rgb"))
+    assert frame.shape == (H, W, 3)
+    assert np.array_equal(frame, rgb[..., ::-1])
+
+    rgba = random_pixels(4, seed=2)
+    frame = WebSocketHandler._decode_raw_frame(raw_frame(rgba, "rgba"))
+    assert frame.shape == (H, W, 3)
+    assert np.array_equal(frame, rgba[..., 2::-1])
+
+
+def test_bad_raw_frames_decode_to_none():
+    handler = make_handler()
+    try:
+        short = raw_frame(random_pixels(3), "bgr")
+        short["data"] = short["data"][:-1]
+        assert handler._decode_frame(short) is None
+
+        assert handler._decode_frame(raw_frame(random_pixels(3), "yuv")) is None
+
+        # rgba dimensions with rgb data
+        assert handler._decode_frame(raw_frame(random_pixels(3), "rgba")) is None
+    finally:
+        handler.cleanup_all()
+
+
+def test_process_frame_raw_event():
+    handler = make_handler()
+    sid, stream_id = "sid", "cam"
+    seen = []
+
+    def pre_stage(frame, timestamp):
+        seen.append(frame.copy())
+
+    handler._chains[(sid, stream_id)] = ((pre_stage,), None)
+    event = handler.sio.handlers["/"]["process_frame_raw"]
+    rgb = random_pixels(3, seed=3)
+
+    async def send(raw):
+        await event(sid, {"stream_id": stream_id, "timestamp_ms": 1, **raw})
+        task = handler._consumer_tasks.get((sid, stream_id))
+        if task is not None:
+            await task
+
+    try:
+        with mock.patch.object(handler.sio, "emit", mock.AsyncMock()) as emit:
+            asyncio.run(send(raw_frame(rgb, "rgb")))
+            assert len(seen) == 1 and np.array_equal(seen[0], rgb[..., ::-1])
+            assert emit.await_args.args[0] == "pose_result"
+
+            bad = raw_frame(rgb, "rgb")
+            bad["width"] = W + 1
+            asyncio.run(send(bad))
+            assert len(seen) == 1
+            assert emit.await_args.args[:2] == ("error", {"message": "Invalid frame data"})
+    finally:
+        handler.cleanup_all()
+
+
+if __name__ == "__main__":
+    for test in (test_bgr_is_a_zero_copy_view,
+                 test_rgb_and_rgba_are_converted_to_bgr,
+                 test_bad_raw_frames_decode_to_none,
+                 test_process_frame_raw_event):
+        print(f"{test.__name__} ...")
+        test()
+        print("  PASS")
+    print("\n=== All raw frame tests passed ===")
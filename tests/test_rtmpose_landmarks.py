@@ -0,0 +1,144 @@
+"""Tests for RTMPoseProcessor's table-driven joint aggregation (no model download).
+
+_aggregate_joints averages COCO-133 keypoints into the output joints through
+precomputed gather tables. These tests check it, and the landmark builders on
+top of it, against a straightforward per-joint mean over
+COCO133_TO_OUTPUT_JOINTS, including for models emitting fewer keypoints than
+the table indexes.
+
+Usage:
+    python tests/test_rtmpose_landmarks.py
+    python -m pytest tests/test_rtmpose_landmarks.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+
+import numpy as np
+
+import processors.rtmpose_processor as rtmpose
+from utils.filters import MedianFilter
+
+W, H = 640, 480
+FIELDS = ("x", "y", "z", "visibility", "presence")
+
+
+def naive_joints(feats):
+    """Per-joint mean of (num_poses, num_kpts, 5) feats; joints with no source keypoint are zero."""
+    num_kpts = feats.shape[1]
+    poses = []
+    for pose in feats:
+        joints = {}
+        for name, indices in rtmpose.COCO133_TO_OUTPUT_JOINTS.items():
+            present = [i for i in indices if i < num_kpts]
+            row = pose[present].mean(axis=0) if present else np.zeros(len(FIELDS))
+            joints[name] = dict(zip(FIELDS, row.tolist()))
+        poses.append(joints)
+    return poses
+
+
+def random_keypoints(num_poses, num_kpts, seed=0):
+    rng = np.random.default_rng(seed)
+    kpts_2d = rng.uniform((0, 0), (W, H), size=(num_poses, num_kpts, 2))
+    kpts_3d = rng.uniform(-1.0, 1.0, size=(num_poses, num_kpts, 3))
+    scores = rng.uniform(0.0, 1.0, size=(num_poses, num_kpts))
+    return kpts_3d, kpts_2d, scores
+
+
+def make_processor():
+    processor = rtmpose.RTMPoseProcessor("test", {"pose_processor": {"device": "cpu"}})
+    # A one-frame window makes the z_root median filter a pass-through
+    processor._z_root_filter = MedianFilter(window_size=1)
+    return processor
+
+
+def assert_poses_close(actual, expected):
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        assert list(got) == list(want), "joint order changed"
+        for name in want:
+            np.testing.assert_allclose([got[name][f] for f in FIELDS],
+                                       [want[name][f] for f in FIELDS],
+                                       atol=1e-12, err_msg=name)
+
+
+def test_aggregate_matches_per_joint_mean():
+    for num_kpts in (133, 17):
+        feats = np.random.default_rng(num_kpts).standard_normal((3, num_kpts, len(FIELDS)))
+        joints = rtmpose._aggregate_joints(feats)
+        assert joints.shape == (3, len(rtmpose._OUTPUT_NAMES), len(FIELDS))
+        assert_poses_close([rtmpose._joints_to_dicts(j) for j in joints], naive_joints(feats))
+
+    # Multi-source joints are true means, not a copy of one source
+    pose = naive_joints(feats)[0]
+    np.testing.assert_allclose(pose["hipCentre"]["x"], feats[0, [11, 12], 0].mean())
+    np.testing.assert_allclose(pose["neck"]["y"], feats[0, [5, 6], 1].mean())
+
+
+def test_body_only_model_zeroes_missing_joints():
+    feats = np.ones((2, 17, len(FIELDS)))
+    poses = [rtmpose._joints_to_dicts(j) for j in rtmpose._aggregate_joints(feats)]
+    for pose in poses:
+        for name in ("leftToe", "rightToe", "leftThumb", "rightPinky"):
+            assert all(v == 0.0 for v in pose[name].values()), name
+        for name in ("hipCentre", "neck", "leftAnkle"):
+            assert all(v == 1.0 for v in pose[name].values()), name
+
+
+def test_2d_landmarks_match_per_joint_mean():
+    processor = make_processor()
+    for num_kpts in (133, 17):
+        _, kpts_2d, scores = random_keypoints(3, num_kpts)
+        feats = np.zeros((3, num_kpts, len(FIELDS)))
+        feats[..., 0] = kpts_2d[..., 0] / W
+        feats[..., 1] = kpts_2d[..., 1] / H
+        feats[..., 3] = feats[..., 4] = scores
+        assert_poses_close(processor._build_2d_landmarks(kpts_2d, scores, W, H),
+                           naive_joints(feats))
+
+
+def test_world_landmarks_match_per_joint_mean():
+    processor = make_processor()
+    f_est = float(max(W, H))
+    for num_kpts in (133, 17):
+        kpts_3d, kpts_2d, scores = random_keypoints(3, num_kpts, seed=1)
+        # Person 2 has no confidently visible body keypoints: z_root falls back to 3.0
+        scores[2, 5:17] = 0.1
+
+        expected, roots = [], []
+        for p in range(3):
+            body_ys = [kpts_2d[p, i, 1] for i in range(5, 17) if scores[p, i] > 0.3]
+            if len(body_ys) >= 2:
+                z_root = rtmpose._TORSO_LEG_HEIGHT * f_est / max(max(body_ys) - min(body_ys), 50.0)
+            else:
+                z_root = 3.0
+            centre = kpts_2d[p, [11, 12]].mean(axis=0)
+            hip_z = kpts_3d[p, [11, 12], 2].mean()
+            scale = z_root / f_est
+            feats = np.zeros((1, num_kpts, len(FIELDS)))
+            for i in range(num_kpts):
+                feats[0, i] = ((kpts_2d[p, i, 0] - centre[0]) * scale,
+                               (kpts_2d[p, i, 1] - centre[1]) * scale,
+                               kpts_3d[p, i, 2] - hip_z,
+                               scores[p, i], scores[p, i])
+            expected += naive_joints(feats)
+            roots.append((z_root, (centre - (W / 2, H / 2)) * scale))
+
+        actual = processor._build_world_landmarks(kpts_3d, kpts_2d, scores, W, H)
+        assert_poses_close(actual, expected)
+        assert roots[2][0] == 3.0
+        for root, (z_root, xy) in zip(processor._root_positions, roots):
+            np.testing.assert_allclose([root["x"], root["y"], root["z"]], [*xy, z_root])
+
+
+if __name__ == "__main__":
+    for test in (test_aggregate_matches_per_joint_mean,
+                 test_body_only_model_zeroes_missing_joints,
+                 test_2d_landmarks_match_per_joint_mean,
+                 test_world_landmarks_match_per_joint_mean):
+        print(f"{test.__name__} ...")
+        test()
+        print("  PASS")
+    print("\n=== All RTMPose landmark tests passed ===")
@@ -0,0 +1,106 @@
+"""Contract tests for the rtmlib internals RTMPoseProcessor builds on (no model download).
+
+_PooledWholebody3d / _DeferredSessionTool stand in for parts of rtmlib's
+BaseTool and Wholebody3d, and PoseTracker picks the 3D output signature by
+the pose model's class name. These tests build the pooled solution from
+dummy ONNX files so an rtmlib upgrade that breaks any of that fails here.
+
+Usage:
+    python tests/test_rtmpose_pooled_sessions.py
+    python -m pytest tests/test_rtmpose_pooled_sessions.py
+"""
+
+import os
+import sys
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper
+from rtmlib import PoseTracker, RTMPose3d, YOLOX
+
+import processors.rtmpose_processor as rtmpose
+
+NUM_KPTS = 133
+
+
+def write_dummy_onnx(path):
+    """Identity graph; only loaded into a session, never run."""
+    value = helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 3, 4, 4])
+    out = helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 3, 4, 4])
+    graph = helper.make_graph([helper.make_node("Identity", ["x"], ["y"])], "g", [value], [out])
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    onnx.save(model, path)
+
+
+def dummy_modes(path):
+    return {"balanced": {"det": path, "det_input_size": (640, 640),
+                         "pose": path, "pose_input_size": (288, 384)}}
+
+
+def fake_pose_call(self, image, bboxes=[]):
+    n = len(bboxes)
+    return (np.zeros((n, NUM_KPTS, 3), np.float32), np.ones((n, NUM_KPTS), np.float32),
+            np.zeros((n, NUM_KPTS, 3), np.float32), np.full((n, NUM_KPTS, 2), 5.0, np.float32))
+
+
+def test_pooled_tracker_matches_rtmlib_contract():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dummy.onnx")
+        write_dummy_onnx(path)
+        with mock.patch.object(rtmpose._PooledWholebody3d, "MODE", dummy_modes(path)):
+            tracker = PoseTracker(rtmpose._PooledWholebody3d, det_frequency=7, tracking=False,
+                                  mode="balanced", to_openpose=False,
+                                  backend="onnxruntime", device="cpu")
+
+    assert isinstance(tracker.det_model, YOLOX)
+    assert isinstance(tracker.pose_model, RTMPose3d)
+    assert tracker.det_mode is not None
+    for model in (tracker.det_model, tracker.pose_model):
+        assert model.session is None, "rtmlib opened its own session"
+        assert model.onnx_model == path
+        assert model.backend == "onnxruntime" and model.device == "cpu"
+    assert tracker.pose_model.model_input_size == (288, 384)
+    assert tracker.pose_model.mean is not None and tracker.pose_model.std is not None
+
+    image = np.zeros((48, 64, 3), np.uint8)
+    with mock.patch.object(YOLOX, "__call__", lambda self, img: np.array([[0, 0, 64, 48]])), \
+            mock.patch.object(RTMPose3d, "__call__", fake_pose_call):
+        out = tracker(image)
+    assert len(out) == 4, "PoseTracker did not take the RTMPose3d (4-tuple) path"
+    keypoints, scores, keypoints_simcc, keypoints_2d = out
+    assert keypoints.shape == (1, NUM_KPTS, 3)
+    assert keypoints_2d.shape == (1, NUM_KPTS, 2)
+
+
+def test_processors_share_pooled_sessions():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dummy.onnx")
+        write_dummy_onnx(path)
+        config = {"pose_processor": {"device": "cpu", "backend": "onnxruntime",
+                                     "annotate": False}}
+        processors = [rtmpose.RTMPoseProcessor(f"p{i}", config) for i in range(2)]
+        with mock.patch.object(rtmpose._PooledWholebody3d, "MODE", dummy_modes(path)):
+            for processor in processors:
+                assert processor.initialize()
+        try:
+            first, second = (p.pose_tracker for p in processors)
+            assert first.det_model.session is not None
+            assert first.det_model.session is second.det_model.session
+            assert first.pose_model.session is second.pose_model.session
+        finally:
+            for processor in processors:
+                processor.cleanup()
+
+
+if __name__ == "__main__":
+    for test in (test_pooled_tracker_matches_rtmlib_contract,
+                 test_processors_share_pooled_sessions):
+        print(f"{test.__name__} ...")
+        test()
+        print("  PASS")
+    print("\n=== All RTMPose pooled-session tests passed ===")
@@ -0,0 +1,90 @@
+"""Parity tests for the TCPFormer ONNX export (no checkpoint download needed).
+
+On CPU, YoloTCPFormerProcessor swaps the exported graph in for the PyTorch
+model whenever it exists, so the graph written by
+scripts/export_tcpformer_onnx.py must match PyTorch. A small randomized model
+is exported, optimized and quantized through the script's own functions.
+
+Usage:
+    python tests/test_tcpformer_onnx.py
+    python -m pytest tests/test_tcpformer_onnx.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend"))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "scripts"))
+
+import numpy as np
+import onnx
+import onnxruntime as ort
+import torch
+
+import export_tcpformer_onnx as exporter
+from models.tcpformer.model import MemoryInducedTransformer
+
+N_FRAMES = 9
+
+
+def build_model():
+    torch.manual_seed(0)
+    model = MemoryInducedTransformer(n_layers=2, dim_in=3, dim_feat=16, dim_rep=32,
+                                     dim_out=3, num_heads=2, num_joints=17,
+                                     n_frames=N_FRAMES)
+    with torch.no_grad():
+        for param in model.parameters():
+            param.normal_(0.0, 0.2)
+    return model.eval()
+
+
+def run_onnx(path, x):
+    session = ort.InferenceSession(str(path), providers=["CPUExecutionProvider"])
+    return session.run(None, {"input": x})[0]
+
+
+def test_exported_graph_matches_pytorch():
+    model = build_model()
+    x = np.random.default_rng(0).standard_normal((2, N_FRAMES, 17, 3)).astype(np.float32)
+    with torch.no_grad():
+        expected = model(torch.from_numpy(x)).numpy()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tcpformer.onnx"
+        exporter.export(path, model=model, n_frames=N_FRAMES)
+        np.testing.assert_allclose(run_onnx(path, x), expected, atol=1e-5)
+
+        # The transformer fusion passes must not change the result either
+        exporter.optimize(path)
+        np.testing.assert_allclose(run_onnx(path, x), expected, atol=1e-5)
+
+
+def test_int8_graph_keeps_fp32_layers():
+    model = build_model()
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = Path(tmp) / "tcpformer.onnx", Path(tmp) / "tcpformer_int8.onnx"
+        exporter.export(src, model=model, n_frames=N_FRAMES)
+        exporter.optimize(src)
+        keep = exporter.fp32_nodes(src)
+        assert sorted(keep) == ["/head/MatMul", "/joints_embed/MatMul"], keep
+
+        exporter.quantize_int8(src, dst)
+        nodes = {node.name: node.op_type for node in onnx.load(str(dst)).graph.node}
+        for name in keep:
+            assert nodes.get(name) == "MatMul", f"{name} was quantized"
+        assert any("Integer" in op for op in nodes.values()), "nothing was quantized"
+
+        x = np.zeros((1, N_FRAMES, 17, 3), dtype=np.float32)
+        assert run_onnx(dst, x).shape == (1, N_FRAMES, 17, 3)
+
+
+if __name__ == "__main__":
+    for test in (test_exported_graph_matches_pytorch,
+                 test_int8_graph_keeps_fp32_layers):
+        print(f"{test.__name__} ...")
+        test()
+        print("  PASS")
+    print("\n=== All TCPFormer ONNX tests passed ===")